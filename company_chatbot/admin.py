@@ -0,0 +1,264 @@
+"""
+Admin module for the chatbot system.
+This module holds operator-only endpoints for inspecting a live worker.
+They are disabled unless ADMIN_TOKEN is set, and every call must send the
+token in the X-Admin-Token header.
+
+The profile endpoints drive the sampling CPU profiler in profiler.py.
+
+The memory endpoints wrap tracemalloc: start tracing, list the top
+allocation sites, diff against the snapshot taken at start (or at the last
+/snapshot call), and stop. Tracing stops by itself after
+MEMORY_TRACE_MAX_SECONDS, so a forgotten session cannot slow a production
+worker for long. The cache report lists the sizes of the app's own caches
+alongside process memory.
+"""
+
+import hmac
+import os
+import threading
+import time
+import tracemalloc
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from company_logic import CRAWLED_URLS
+from compression import VARIANT_CACHE, _variant_lock
+from content_store import CONTENT_STORE
+from profiler import PROFILE_HZ, PROFILER
+from sessions import SESSIONS
+
+# Admin endpoints are off unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Tracing is switched off automatically after this long
+MEMORY_TRACE_MAX_SECONDS = float(os.getenv("MEMORY_TRACE_MAX_SECONDS", "300"))
+
+# Upper bound on stack depth recorded per allocation; deeper stacks cost more
+MEMORY_TRACE_MAX_FRAMES = 25
+
+# Allocations made by the tracing machinery itself are not interesting
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """
+    Reject callers without the admin token; hide the endpoints entirely when
+    no token is configured.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+class MemoryTracer:
+    """
+    Start/stop wrapper around tracemalloc with a baseline snapshot and an
+    automatic stop timer.
+    """
+    def __init__(self, max_seconds: float = MEMORY_TRACE_MAX_SECONDS):
+        self.max_seconds = max_seconds
+        self.baseline = None
+        self.started_at = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    def start(self, frames: int) -> dict:
+        with self._lock:
+            if tracemalloc.is_tracing():
+                raise HTTPException(status_code=409, detail="Memory tracing is already running")
+            tracemalloc.start(max(1, min(frames, MEMORY_TRACE_MAX_FRAMES)))
+            self.started_at = time.monotonic()
+            self.baseline = self._snapshot()
+            self._timer = threading.Timer(self.max_seconds, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            tracemalloc.stop()
+            self.baseline = None
+            self.started_at = None
+        return self.status()
+
+    def _require_tracing(self):
+        # Caller holds the lock, so the auto-stop timer cannot stop tracing before the snapshot
+        if not tracemalloc.is_tracing():
+            raise HTTPException(status_code=409, detail="Memory tracing is not running; POST /admin/memory/start first")
+
+    def mark(self) -> dict:
+        """
+        Replace the baseline that diffs are taken against.
+        """
+        with self._lock:
+            self._require_tracing()
+            self.baseline = self._snapshot()
+        return self.status()
+
+    def top(self, key_type: str, limit: int) -> list:
+        with self._lock:
+            self._require_tracing()
+            snapshot = self._snapshot()
+        stats = snapshot.statistics(key_type)
+        return [_stat_dict(stat) for stat in stats[:limit]]
+
+    def diff(self, key_type: str, limit: int) -> list:
+        with self._lock:
+            self._require_tracing()
+            baseline = self.baseline
+            snapshot = self._snapshot()
+        stats = snapshot.compare_to(baseline, key_type)
+        return [_stat_dict(stat) for stat in stats[:limit]]
+
+    def status(self) -> dict:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "seconds_left": round(self.max_seconds - (time.monotonic() - self.started_at), 1) if self.started_at else 0,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+        }
+
+
+def _stat_dict(stat) -> dict:
+    """
+    Flatten a tracemalloc Statistic or StatisticDiff for JSON.
+    """
+    entry = {
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+def _process_memory() -> dict:
+    """
+    Resident and peak memory of this process, from /proc when available.
+    """
+    memory = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    name, value = line.split(":", 1)
+                    memory["rss_bytes" if name == "VmRSS" else "rss_peak_bytes"] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def cache_sizes() -> dict:
+    """
+    Entry counts and approximate byte sizes of the app's own caches.
+    """
+    with _variant_lock:
+        variants = list(VARIANT_CACHE.values())
+    return {
+        "content_store": {
+            "pages": len(CONTENT_STORE),
+            "text_chars": CONTENT_STORE.total_chars(),
+        },
+        "reply_cache": {
+            "entries": len(variants),
+            "body_bytes": sum(len(body) for body in variants),
+        },
+        "session_store": {
+            "sessions": len(SESSIONS),
+            "estimated_bytes": SESSIONS.bytes_used,
+            "evictions": SESSIONS.evictions,
+        },
+        "crawled_urls": len(CRAWLED_URLS),
+    }
+
+
+MEMORY_TRACER = MemoryTracer()
+
+
+@router.post("/memory/start")
+def memory_start(frames: int = 10):
+    """Start tracing allocations, keeping `frames` stack frames per allocation"""
+    return MEMORY_TRACER.start(frames)
+
+
+@router.post("/memory/stop")
+def memory_stop():
+    """Stop tracing allocations and drop the snapshots"""
+    return MEMORY_TRACER.stop()
+
+
+@router.post("/memory/snapshot")
+def memory_snapshot():
+    """Take a new baseline snapshot for /memory/diff"""
+    return MEMORY_TRACER.mark()
+
+
+@router.get("/memory/top")
+def memory_top(limit: int = 25, group_by: str = "lineno"):
+    """Top allocation sites by size, grouped by lineno, filename or traceback"""
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by must be lineno, filename or traceback")
+    return {"status": MEMORY_TRACER.status(), "top": MEMORY_TRACER.top(group_by, limit)}
+
+
+@router.get("/memory/diff")
+def memory_diff(limit: int = 25, group_by: str = "lineno"):
+    """Allocation growth since the baseline snapshot"""
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by must be lineno, filename or traceback")
+    return {"status": MEMORY_TRACER.status(), "diff": MEMORY_TRACER.diff(group_by, limit)}
+
+
+@router.get("/memory/caches")
+def memory_caches():
+    """Sizes of the app's caches and the process's memory"""
+    return {"process": _process_memory(), "caches": cache_sizes(), "tracing": MEMORY_TRACER.status()}
+
+
+@router.post("/profile/start")
+def profile_start(seconds: float = 30, hz: float = PROFILE_HZ):
+    """Sample all threads' stacks for `seconds` at `hz` samples per second"""
+    if not PROFILER.start(seconds, hz):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PROFILER.status()
+
+
+@router.post("/profile/stop")
+def profile_stop():
+    """End the running profile early and write its files"""
+    PROFILER.stop()
+    return PROFILER.status()
+
+
+@router.get("/profile")
+def profile_status():
+    """State of the running or last profile, with samples per tier and files written"""
+    return PROFILER.status()
+
+
+@router.get("/profile/collapsed")
+def profile_collapsed(tier: str = None):
+    """Collapsed stacks of the last profile, for one tier or all with the tier as root frame"""
+    if PROFILER.running:
+        raise HTTPException(status_code=409, detail="The profile is still running")
+    return PlainTextResponse(PROFILER.collapsed(tier, with_tier=tier is None))
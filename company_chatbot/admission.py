@@ -0,0 +1,296 @@
+"""
+Admission control module for the chatbot system.
+This module rate limits clients with per-client token buckets and caps the
+number of requests in flight, queueing the rest by route tier priority and
+shedding them early when they cannot be served in time.
+
+Route tiers are split into bulkheads, each with its own concurrency cap and
+wait queue: slow page fetches can fill the "fetch" bulkhead but never take
+the worker threads reserved for FAQ, microbot and other static replies in
+the "fast" one.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import anyio.to_thread
+from fastapi import HTTPException, Request
+from metrics import Counter, Gauge, Histogram
+
+# Per-client token bucket: sustained requests per second and burst size
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "5"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+
+# Number of client buckets kept before the least recently seen are dropped
+MAX_TRACKED_CLIENTS = int(os.getenv("MAX_TRACKED_CLIENTS", "10000"))
+
+# Global cap on requests in flight, split between the bulkheads
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "32"))
+
+# Share of MAX_CONCURRENT_REQUESTS given to page fetches; the rest serves fast tiers
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+
+# Bounded wait queue per bulkhead and the longest a request may wait in it
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "64"))
+FETCH_QUEUED_REQUESTS = int(os.getenv("FETCH_QUEUED_REQUESTS", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+
+# Honour X-Forwarded-For only when running behind a trusted proxy
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+# Lower value is admitted first; page fetches yield to static replies
+TIER_PRIORITY = {
+    "faq": 0,
+    "microbot": 0,
+    "button": 0,
+    "fallback": 0,
+    "continue": 0,
+    "page": 1,
+}
+
+# Bulkhead serving each route tier; unknown tiers go to the fetch bulkhead
+TIER_BULKHEAD = {
+    "faq": "fast",
+    "microbot": "fast",
+    "button": "fast",
+    "fallback": "fast",
+    "continue": "fast",
+    "page": "fetch",
+}
+
+# Worker threads kept free beyond the bulkhead caps for streaming and other threadpool work
+THREADPOOL_HEADROOM = 8
+
+BULKHEAD_ACTIVE = Gauge("chatbot_bulkhead_active", "Requests holding a slot, per bulkhead", ("bulkhead",))
+BULKHEAD_QUEUED = Gauge("chatbot_bulkhead_queue_depth", "Requests waiting for a slot, per bulkhead", ("bulkhead",))
+BULKHEAD_WAIT = Histogram("chatbot_bulkhead_wait_seconds", "Time admitted requests waited for a slot", ("bulkhead",))
+BULKHEAD_SHED = Counter("chatbot_bulkhead_shed_total", "Requests rejected by a bulkhead", ("bulkhead", "reason"))
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate` tokens per second.
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Take one token. Returns 0 on success, otherwise the seconds until
+        a token becomes available.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+class RateLimiter:
+    """
+    Per-client token buckets with a bounded number of tracked clients.
+    """
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client_id: str) -> float:
+        """
+        Charge one request to a client. Returns 0 when allowed, otherwise
+        the suggested Retry-After in seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, now)
+                self._buckets[client_id] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_id)
+            return bucket.take(now)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class Shed(Exception):
+    """
+    Raised when a request is rejected by the concurrency gate.
+    """
+
+
+class PriorityGate:
+    """
+    Concurrency limiter with a bounded priority wait queue.
+
+    Must only be used from the event loop thread. Freed slots are handed
+    directly to the highest priority waiter so that queued page fetches
+    never overtake queued microbot requests.
+    """
+    def __init__(self, capacity: int, max_queue: int, name: str = "all"):
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.shed = 0
+        # Exponentially weighted mean time a slot is held, in seconds
+        self.service_time = 0.05
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def estimated_wait(self, priority: int) -> float:
+        """
+        Estimate how long a new request at this priority would wait.
+        """
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority and not waiter[2].done())
+        return (ahead + 1) * self.service_time / max(self.capacity, 1)
+
+    async def acquire(self, priority: int, timeout: float):
+        """
+        Wait for a slot, raising Shed if it cannot be granted within timeout.
+        """
+        if self.active < self.capacity and self.queued == 0:
+            self.active += 1
+            BULKHEAD_ACTIVE.set(self.active, bulkhead=self.name)
+            BULKHEAD_WAIT.observe(0.0, bulkhead=self.name)
+            return
+
+        if self.queued >= self.max_queue:
+            self._shed("queue_full")
+            raise Shed("admission queue is full")
+        if self.estimated_wait(priority) > timeout:
+            self._shed("deadline")
+            raise Shed("queue wait would exceed the deadline")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, waiter)
+        self.queued += 1
+        BULKHEAD_QUEUED.set(self.queued, bulkhead=self.name)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException as e:
+            # Timed out, or the request was cancelled (client gone, server stopping)
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the wait was abandoned; pass it on
+                self._hand_off()
+            else:
+                future.cancel()
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self.queued -= 1
+                BULKHEAD_QUEUED.set(self.queued, bulkhead=self.name)
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed("timeout")
+                raise Shed("timed out waiting for a slot")
+            raise
+        BULKHEAD_WAIT.observe(time.monotonic() - started, bulkhead=self.name)
+
+    def _shed(self, reason: str):
+        self.shed += 1
+        BULKHEAD_SHED.inc(bulkhead=self.name, reason=reason)
+
+    def release(self, held_for: float):
+        """
+        Release a slot, handing it to the next waiter if there is one.
+        """
+        self.service_time = 0.9 * self.service_time + 0.1 * held_for
+        self._hand_off()
+
+    def _hand_off(self):
+        """
+        Give a freed slot to the highest priority waiter, or free it.
+        """
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.queued -= 1
+                BULKHEAD_QUEUED.set(self.queued, bulkhead=self.name)
+                future.set_result(None)
+                return
+        self.active -= 1
+        BULKHEAD_ACTIVE.set(self.active, bulkhead=self.name)
+
+
+RATE_LIMITER = RateLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, MAX_TRACKED_CLIENTS)
+BULKHEADS = {
+    "fast": PriorityGate(max(MAX_CONCURRENT_REQUESTS - FETCH_CONCURRENCY, 1), MAX_QUEUED_REQUESTS, "fast"),
+    "fetch": PriorityGate(FETCH_CONCURRENCY, FETCH_QUEUED_REQUESTS, "fetch"),
+}
+
+
+def size_threadpool():
+    """
+    Make sure the worker threadpool has a thread for every bulkhead slot, so
+    an admitted fast request never waits behind page fetches for a thread.
+    Must be called from the event loop.
+    """
+    needed = sum(gate.capacity for gate in BULKHEADS.values()) + THREADPOOL_HEADROOM
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, needed)
+
+
+def client_id(request: Request) -> str:
+    """
+    Identify the client a request should be charged to.
+    """
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+@asynccontextmanager
+async def admit(request: Request, tier):
+    """
+    Admit a request for the given route tier or reject it with 429/503.
+    tier may also be an async function returning the tier; it is only
+    called once the client is within its rate limit, so rejected clients
+    cost no routing work.
+    """
+    retry_after = RATE_LIMITER.check(client_id(request))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests. Please slow down.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+    if callable(tier):
+        tier = await tier()
+    gate = BULKHEADS[TIER_BULKHEAD.get(tier, "fetch")]
+
+    try:
+        await gate.acquire(TIER_PRIORITY.get(tier, 1), ADMISSION_QUEUE_TIMEOUT)
+    except Shed as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server is busy ({e}). Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    # Handlers tag their CPU profile samples with the tier they were admitted for
+    request.state.tier = tier
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        gate.release(time.monotonic() - started)
@@ -0,0 +1,95 @@
+"""
+Content store module for the chatbot system.
+This module keeps the full extracted text of each fetched page so long
+answers can be continued slice by slice from a cursor, without fetching or
+parsing the page again.
+"""
+
+import hashlib
+import threading
+
+
+class PageText:
+    """
+    Full extracted text of one page version, with the hash of the raw
+    body it was extracted from and its extractive summary. summary is None
+    until the refresh pipeline has summarized the page, and "" for pages
+    short enough to be shown whole.
+    """
+    __slots__ = ("url", "text", "doc_id", "body_hash", "summary")
+
+    def __init__(self, url: str, text: str, doc_id: str, body_hash: str = None, summary: str = None):
+        self.url = url
+        self.text = text
+        self.doc_id = doc_id
+        self.body_hash = body_hash
+        self.summary = summary
+
+
+class ContentStore:
+    """
+    Extracted page text keyed by URL and by document ID.
+
+    Document IDs are derived from the text, so a cursor into an old version
+    of a page stops resolving once the page changes.
+    """
+    def __init__(self):
+        self._by_url = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    def put(self, url: str, text: str, body_hash: str = None, summary: str = None) -> PageText:
+        """
+        Store the latest text for a URL, replacing any previous version.
+        If the text is unchanged the existing version (and its cursors) is
+        kept and only its body hash, and summary when given, are updated.
+        """
+        doc_id = hashlib.sha1(f"{url}\n{text}".encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            previous = self._by_url.get(url)
+            if previous is not None and previous.doc_id == doc_id:
+                previous.body_hash = body_hash
+                if summary is not None:
+                    previous.summary = summary
+                return previous
+            page = PageText(url, text, doc_id, body_hash, summary)
+            if previous is not None:
+                self._by_id.pop(previous.doc_id, None)
+            self._by_url[url] = page
+            self._by_id[doc_id] = page
+            return page
+
+    def get(self, url: str):
+        """
+        Return the stored PageText for a URL, or None.
+        """
+        return self._by_url.get(url)
+
+    def resolve(self, cursor: str):
+        """
+        Turn a cursor into (PageText, offset), or None if it is invalid or stale.
+        """
+        doc_id, _, offset = (cursor or "").partition(".")
+        page = self._by_id.get(doc_id)
+        if page is None or not offset.isdigit():
+            return None
+        return page, int(offset)
+
+    def __len__(self):
+        return len(self._by_url)
+
+    def total_chars(self) -> int:
+        """
+        Total number of characters held, for memory reporting.
+        """
+        return sum(len(page.text) for page in list(self._by_url.values()))
+
+
+def make_cursor(page: PageText, offset: int) -> str:
+    """
+    Build an opaque cursor pointing at `offset` in a page's text.
+    """
+    return f"{page.doc_id}.{offset}"
+
+
+CONTENT_STORE = ContentStore()
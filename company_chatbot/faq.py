@@ -0,0 +1,88 @@
+"""
+FAQ module for the chatbot system.
+This module answers greetings, thanks, goodbyes and the most common exact
+questions from a hash table loaded from faq.json, before any keyword
+scanning. Messages are canonicalized first, so "Hi!", "hello there" and
+"Good Morning 🙂" all hit the table.
+"""
+
+import json
+import os
+import unicodedata
+from microbots import MICROBOTS_BY_NAME
+from routing_snapshot import load_or_build
+
+# FAQ data file; defaults to faq.json next to this module
+FAQ_PATH = os.getenv("FAQ_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "faq.json"))
+
+# Longer messages are never FAQ questions, so they skip canonicalization
+FAQ_MAX_LENGTH = 120
+
+# Apostrophes are dropped outright so "what's" and "whats" match
+_DROPPED = {"'", "\u2019", "\u02bc"}
+
+
+def _is_stripped(ch: str) -> bool:
+    """
+    Punctuation, symbols (including emoji), control/format characters and
+    emoji variation selectors are replaced by spaces.
+    """
+    category = unicodedata.category(ch)
+    return category[0] in "PSC" or "\ufe00" <= ch <= "\ufe0f"
+
+
+def canonicalize(text: str) -> str:
+    """
+    NFKC-normalize, casefold, strip punctuation and emoji and collapse
+    whitespace.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    chars = []
+    for ch in text:
+        if ch in _DROPPED:
+            continue
+        chars.append(" " if _is_stripped(ch) else ch)
+    return " ".join("".join(chars).split())
+
+
+class FaqEntry:
+    """
+    Precomputed answer for one canonical question.
+    """
+    __slots__ = ("intent", "bot", "reply")
+
+    def __init__(self, intent: str, bot: str, reply: str):
+        self.intent = intent
+        self.bot = bot
+        self.reply = reply
+
+
+def load_faq(path: str = FAQ_PATH) -> dict:
+    """
+    Build the canonical question -> FaqEntry table from a FAQ data file.
+
+    Each entry lists its questions and either a fixed "reply" or the name of
+    the microbot whose reply is precomputed for each question.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    table = {}
+    for item in data["entries"]:
+        bot_name = item.get("bot")
+        bot = MICROBOTS_BY_NAME[bot_name] if bot_name else None
+        for question in item["questions"]:
+            reply = bot.respond(question) if bot else item["reply"]
+            table[canonicalize(question)] = FaqEntry(item["intent"], bot_name, reply)
+    return table
+
+
+FAQ_TABLE = load_or_build("faq", load_faq, FAQ_PATH)
+
+
+def lookup_faq(message: str):
+    """
+    Return the FaqEntry for a message, or None.
+    """
+    if len(message) > FAQ_MAX_LENGTH:
+        return None
+    return FAQ_TABLE.get(canonicalize(message))
@@ -0,0 +1,130 @@
+"""
+Local corpus module for the chatbot system.
+This module serves LOCAL_TESTING mode from memory. Every HTML file in the
+local data directory is read and its text extracted once; afterwards the
+directory is re-scanned at most every LOCAL_CORPUS_CHECK_SECONDS and only
+files whose modification time or size changed are read and extracted again,
+in the background. Load tests in local mode therefore measure the bot, not
+disk reads, HTML parsing and summarization.
+"""
+
+import logging
+import os
+import threading
+import time
+from metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Longest a changed local file may go unnoticed
+LOCAL_CORPUS_CHECK_SECONDS = float(os.getenv("LOCAL_CORPUS_CHECK_SECONDS", "1.0"))
+
+LOCAL_CORPUS_FILES = Gauge("chatbot_local_corpus_files", "HTML files held by the local corpus")
+LOCAL_CORPUS_LOADS = Counter("chatbot_local_corpus_loads_total", "Local files read and extracted, by reason", ("reason",))
+
+
+class LocalFile:
+    """
+    Extracted text and summary of one local HTML file, with the stat fields
+    used to detect changes and the hash of its raw body.
+    """
+    __slots__ = ("name", "stamp", "text", "summary", "body_hash")
+
+    def __init__(self, name: str, stamp: tuple, text: str, summary: str, body_hash: str):
+        self.name = name
+        self.stamp = stamp
+        self.text = text
+        self.summary = summary
+        self.body_hash = body_hash
+
+
+class LocalCorpus:
+    """
+    In-memory text of every *.html file in a directory, kept in step with
+    the files by polling their mtime and size.
+
+    extract(html) returns the (text, summary) of a page and digest(html)
+    the hash of its body; both are supplied by the caller so this module stays free of
+    the parsing code.
+    """
+    def __init__(self, directory: str, extract, digest, check_seconds: float = LOCAL_CORPUS_CHECK_SECONDS,
+                 clock=time.monotonic):
+        self.directory = directory
+        self.extract = extract
+        self.digest = digest
+        self.check_seconds = check_seconds
+        self.clock = clock
+        self.files = {}
+        self.loaded = False
+        self._checked_at = None
+        self._scan_lock = threading.Lock()
+
+    def _read(self, name: str, stamp: tuple, reason: str) -> LocalFile:
+        with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+            html = f.read()
+        LOCAL_CORPUS_LOADS.inc(reason=reason)
+        text, summary = self.extract(html)
+        return LocalFile(name, stamp, text, summary, self.digest(html))
+
+    def scan(self):
+        """
+        Re-read new and modified files and forget deleted ones.
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith(".html") and entry.is_file()]
+        except FileNotFoundError:
+            entries = []
+        files = dict(self.files)
+        seen = set()
+        for entry in entries:
+            seen.add(entry.name)
+            stat = entry.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            current = files.get(entry.name)
+            if current is not None and current.stamp == stamp:
+                continue
+            try:
+                files[entry.name] = self._read(entry.name, stamp, "changed" if current else "new")
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Could not load local file {entry.name}: {str(e)}")
+        for name in set(files) - seen:
+            del files[name]
+        # Swap in the new mapping whole so readers never see a half-updated corpus
+        self.files = files
+        self._checked_at = self.clock()
+        self.loaded = True
+        LOCAL_CORPUS_FILES.set(len(files))
+
+    def _scan_and_release(self):
+        try:
+            if not self.loaded or self.clock() - self._checked_at >= self.check_seconds:
+                self.scan()
+        finally:
+            self._scan_lock.release()
+
+    def check(self):
+        """
+        Scan the directory if the last scan is older than check_seconds. The
+        first load blocks; later scans run in a background thread while
+        requests keep being served from the current corpus.
+        """
+        if not self.loaded:
+            self._scan_lock.acquire()
+            self._scan_and_release()
+            return
+        if self.clock() - self._checked_at < self.check_seconds:
+            return
+        if self._scan_lock.acquire(blocking=False):
+            threading.Thread(target=self._scan_and_release, name="local-corpus-scan", daemon=True).start()
+
+    def get(self, name: str):
+        """
+        Return the LocalFile for a file name, or None if there is no such file.
+        """
+        self.check()
+        return self.files.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        self.check()
+        return name in self.files
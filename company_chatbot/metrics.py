@@ -0,0 +1,150 @@
+"""
+Metrics module for the chatbot system.
+This module keeps in-process counters, gauges and histograms and renders
+them in the Prometheus text exposition format for the /metrics endpoint.
+"""
+
+import bisect
+import threading
+
+# All metrics created through this module, in creation order
+REGISTRY = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    """
+    Turn keyword labels into a tuple ordered like the metric's label names.
+    """
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple, key: tuple, extra: str = "") -> str:
+    """
+    Format a label set as {a="x",b="y"}.
+    """
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    """
+    Base class for all metrics.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def samples(self) -> list:
+        """
+        Return (suffix, labels, value) triples for rendering.
+        """
+        with self._lock:
+            return [("", _format_labels(self.labelnames, key), value)
+                    for key, value in sorted(self._values.items())]
+
+    def value(self, **labels) -> float:
+        """
+        Return the current value for a label set (0 if never set).
+        """
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing counter.
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+    """
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram with fixed bucket boundaries.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> list:
+        result = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    result.append(("_bucket", _format_labels(self.labelnames, key, f'le="{bound}"'), cumulative))
+                result.append(("_bucket", _format_labels(self.labelnames, key, 'le="+Inf"'), count))
+                result.append(("_sum", _format_labels(self.labelnames, key), total))
+                result.append(("_count", _format_labels(self.labelnames, key), count))
+        return result
+
+    def value(self, **labels) -> float:
+        """
+        Return the number of observations for a label set.
+        """
+        with self._lock:
+            state = self._values.get(_label_key(self.labelnames, labels))
+            return state[2] if state else 0
+
+
+def render() -> str:
+    """
+    Render every registered metric in Prometheus text format.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in metric.samples():
+            lines.append(f"{metric.name}{suffix}{labels} {value}")
+    return "\n".join(lines) + "\n"
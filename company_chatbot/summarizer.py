@@ -0,0 +1,104 @@
+"""
+Summarizer module for the chatbot system.
+This module builds an extractive summary of a page's text: the sentences
+that best represent the page, picked by how many of the page's frequent
+terms they contain and how early they appear, and returned in page order.
+Navigation labels, headings and other short fragments are never picked.
+
+Summaries are computed by the refresh pipeline when a page's text changes,
+so a request only ever reads a stored summary.
+"""
+
+import os
+import re
+from collections import Counter
+
+# Longest summary, in characters, and most sentences it may hold
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "800"))
+SUMMARY_MAX_SENTENCES = int(os.getenv("SUMMARY_MAX_SENTENCES", "5"))
+
+# Extra weight of the first sentence over the last; it falls off linearly in between
+SUMMARY_POSITION_WEIGHT = 0.5
+
+# Fragments shorter than this are labels or headings, not sentences
+SUMMARY_MIN_WORDS = 6
+# ...unless they end like a sentence
+SUMMARY_MIN_WORDS_PUNCTUATED = 4
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or
+other our ours out over own same she should so some such than that the their theirs them then there these
+they this those through to too under until up very was we were what when where which while who whom why
+will with would you your yours us
+""".split())
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+
+def split_sentences(phrases) -> list:
+    """
+    Split extracted text phrases into sentences. Phrase boundaries (block
+    elements and line breaks in the page) always end a sentence.
+    """
+    sentences = []
+    for phrase in phrases:
+        for sentence in _SENTENCE_END.split(phrase.strip()):
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def _is_sentence(sentence: str, words: int) -> bool:
+    if words >= SUMMARY_MIN_WORDS:
+        return True
+    return words >= SUMMARY_MIN_WORDS_PUNCTUATED and sentence[-1] in ".!?"
+
+
+def summarize(phrases, max_chars: int = SUMMARY_MAX_CHARS, max_sentences: int = SUMMARY_MAX_SENTENCES) -> str:
+    """
+    Return an extractive summary of a page given its text as phrases, or ""
+    when the page has no sentence worth picking.
+
+    Each sentence scores the summed frequency of its content words
+    (normalised by the page's most frequent word, damped by the square root
+    of the sentence length) times a weight favouring sentences near the top
+    of the page. The best sentences that fit in max_chars are kept.
+    """
+    sentences = split_sentences(phrases)
+    candidates = []
+    frequencies = Counter()
+    seen = set()
+    for sentence in sentences:
+        key = sentence.lower()
+        words = [word for word in _WORD.findall(key) if word not in STOPWORDS and len(word) > 2]
+        # Terms count across the whole page, including labels and headings
+        frequencies.update(words)
+        if key in seen or not _is_sentence(sentence, len(sentence.split())) or not words:
+            continue
+        seen.add(key)
+        candidates.append((sentence, words))
+    if not candidates:
+        return ""
+
+    top = max(frequencies.values())
+    last = max(len(candidates) - 1, 1)
+    scored = []
+    for index, (sentence, words) in enumerate(candidates):
+        relevance = sum(frequencies[word] for word in set(words)) / top / len(words) ** 0.5
+        position = 1 + SUMMARY_POSITION_WEIGHT * (1 - index / last)
+        scored.append((relevance * position, -index, sentence))
+
+    picked = []
+    length = 0
+    for _, negative_index, sentence in sorted(scored, reverse=True):
+        if len(picked) >= max_sentences:
+            break
+        added = len(sentence) + (1 if picked else 0)
+        if length + added > max_chars:
+            continue
+        picked.append((-negative_index, sentence))
+        length += added
+    return " ".join(sentence for _, sentence in sorted(picked))
@@ -0,0 +1,104 @@
+"""
+Warm-up module for the chatbot system.
+This module crawls the site and fetches and extracts every section page
+when the app starts, so the first users after a deploy are answered from
+warm caches. Readiness is reported until warm-up finishes or times out.
+A warm-up that times out is abandoned: the app reports ready and the
+timeout shows in the metrics, while the fetches already under way finish
+in the background.
+"""
+
+import logging
+import os
+import threading
+import time
+from company_logic import refresh_pages
+from metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Longest the app reports not-ready while warming up
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
+
+WARMUP_SECONDS = Gauge("chatbot_warmup_seconds", "Time the startup warm-up took")
+WARMUP_COMPLETE = Gauge("chatbot_warmup_complete", "1 once the startup warm-up has finished")
+WARMUP_TIMED_OUT = Gauge("chatbot_warmup_timed_out", "1 if the startup warm-up ran past WARMUP_TIMEOUT")
+
+
+class WarmUp:
+    """
+    Runs the startup warm-up in a background thread and tracks readiness.
+    """
+    def __init__(self, warm=refresh_pages, timeout: float = WARMUP_TIMEOUT, clock=time.monotonic):
+        self.warm = warm
+        self.timeout = timeout
+        self.clock = clock
+        self.started = None
+        self.duration = None
+        self.stats = None
+        self.abandoned = False
+        self._timer = None
+
+    def start(self):
+        """
+        Start warming up without blocking startup.
+        """
+        self.started = self.clock()
+        self._timer = threading.Timer(self.timeout, self._abandon)
+        self._timer.daemon = True
+        self._timer.start()
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _abandon(self):
+        """
+        Called when the timeout passes: record it if warm-up is still running.
+        """
+        if self.finished:
+            return
+        self.abandoned = True
+        WARMUP_SECONDS.set(self.clock() - self.started)
+        WARMUP_TIMED_OUT.set(1)
+        logger.warning(f"Warm-up still running after {self.timeout:g}s; abandoning it and reporting ready")
+
+    def _run(self):
+        try:
+            self.stats = self.warm()
+        except Exception as e:
+            logger.error(f"Error during warm-up: {str(e)}")
+        self.duration = self.clock() - self.started
+        if self._timer is not None:
+            self._timer.cancel()
+        WARMUP_SECONDS.set(self.duration)
+        WARMUP_COMPLETE.set(1)
+        logger.info(f"Warm-up finished in {self.duration:.2f}s: {self.stats}")
+
+    @property
+    def finished(self) -> bool:
+        return self.duration is not None
+
+    @property
+    def timed_out(self) -> bool:
+        if self.abandoned:
+            return True
+        return not self.finished and self.started is not None and self.clock() - self.started > self.timeout
+
+    def ready(self) -> bool:
+        """
+        Ready once warm-up has finished, or has run past its timeout.
+        """
+        return self.finished or self.timed_out
+
+    def status(self) -> dict:
+        """
+        Readiness details for the /ready endpoint.
+        """
+        return {
+            "status": "ready" if self.ready() else "warming_up",
+            "warm": self.finished,
+            "timed_out": self.timed_out,
+            "warmup_seconds": round(self.duration, 3) if self.finished else None,
+            "pages": self.stats,
+        }
+
+
+WARMUP = WarmUp()
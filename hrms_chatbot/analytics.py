@@ -0,0 +1,251 @@
+"""
+Analytics module for the chatbot system.
+This module records every chat message with its route tier, answering bot
+and latency, for tuning keywords. Request threads only append to an
+in-memory ring buffer; a background writer batches the records into
+gzip-compressed, rotating JSON-lines files. In capture mode the raw
+requests are also written, in arrival order, for tools/replay.py.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Analytics logging can be switched off entirely
+ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "true").lower() == "true"
+
+# Capture mode records every incoming request for replay
+CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+
+# Directory the compressed log files are written to
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics_logs")
+
+# Records held in memory before new ones are dropped
+ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", "10000"))
+
+# How often the writer drains the buffer, and the most records per write
+ANALYTICS_FLUSH_SECONDS = float(os.getenv("ANALYTICS_FLUSH_SECONDS", "1.0"))
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "2000"))
+
+# Start a new file past this compressed size, keeping at most this many files
+ANALYTICS_ROTATE_BYTES = int(os.getenv("ANALYTICS_ROTATE_BYTES", str(16 * 1024 * 1024)))
+ANALYTICS_MAX_FILES = int(os.getenv("ANALYTICS_MAX_FILES", "20"))
+
+# Tenant the records belong to, taken from the app's directory name
+TENANT = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+
+ANALYTICS_RECORDS = Counter(
+    "chatbot_analytics_records_total",
+    "Analytics records by outcome (written or dropped)",
+    ("outcome",),
+)
+ANALYTICS_BUFFERED = Gauge("chatbot_analytics_buffered", "Analytics records waiting to be written")
+
+
+class RingBuffer:
+    """
+    Bounded record buffer that never blocks the producer.
+
+    deque.append and deque.popleft are atomic, so producers and the single
+    consumer need no lock. When the buffer is full, new records are dropped
+    and counted; the capacity check is not atomic with the append, so under
+    contention it may be exceeded by a few records.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.dropped = 0
+        self._items = deque()
+
+    def offer(self, item) -> bool:
+        """
+        Add an item unless the buffer is full. Returns whether it was kept.
+        """
+        if len(self._items) >= self.capacity:
+            # Published to the metrics by the writer, to keep locks off this path
+            self.dropped += 1
+            return False
+        self._items.append(item)
+        return True
+
+    def drain(self, max_items: int) -> list:
+        """
+        Remove and return up to max_items of the oldest items.
+        """
+        batch = []
+        items = self._items
+        while items and len(batch) < max_items:
+            batch.append(items.popleft())
+        return batch
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RotatingGzipWriter:
+    """
+    Append batches of JSON lines to gzip files, rotating by size.
+
+    Each batch is written as its own gzip member, so a file is readable
+    with zcat or gzip.open up to the last completed batch even if the
+    process dies mid-write.
+    """
+    def __init__(self, directory: str, prefix: str, rotate_bytes: int, max_files: int):
+        self.directory = directory
+        self.prefix = prefix
+        self.rotate_bytes = rotate_bytes
+        self.max_files = max_files
+        self.path = None
+
+    def _files(self) -> list:
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(self.prefix + "-") and name.endswith(".jsonl.gz")]
+        paths = [os.path.join(self.directory, name) for name in names]
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def _rotate(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}.jsonl.gz")
+        # Several rotations within one second get a counter suffix
+        index = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{index}.jsonl.gz")
+            index += 1
+        self.path = path
+        # Make room for the new file within max_files
+        files = self._files()
+        for old in files[:max(len(files) - self.max_files + 1, 0)]:
+            os.remove(old)
+
+    def write(self, records: list):
+        """
+        Append records as one compressed member, rotating first if needed.
+        """
+        if self.path is None or not os.path.exists(self.path) \
+                or os.path.getsize(self.path) >= self.rotate_bytes:
+            self._rotate()
+        lines = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                        for record in records)
+        with open(self.path, "ab") as f:
+            f.write(gzip.compress(lines.encode("utf-8"), compresslevel=6, mtime=0))
+
+
+class AnalyticsLog:
+    """
+    Ring buffer plus the background thread that drains it to disk.
+    """
+    def __init__(self, writer: RotatingGzipWriter, capacity: int = ANALYTICS_BUFFER_SIZE,
+                 flush_seconds: float = ANALYTICS_FLUSH_SECONDS, batch_size: int = ANALYTICS_BATCH_SIZE):
+        self.writer = writer
+        self.buffer = RingBuffer(capacity)
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._reported_drops = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the background writer thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stop the writer and flush whatever is still buffered.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def record(self, record: dict) -> bool:
+        """
+        Queue a record for writing; never blocks.
+        """
+        return self.buffer.offer(record)
+
+    def flush(self):
+        """
+        Write everything currently buffered.
+        """
+        while True:
+            batch = self.buffer.drain(self.batch_size)
+            if not batch:
+                break
+            try:
+                self.writer.write(batch)
+                ANALYTICS_RECORDS.inc(len(batch), outcome="written")
+            except OSError as e:
+                # A full or unwritable disk must not take the writer down
+                logger.error(f"Error writing analytics records: {str(e)}")
+                ANALYTICS_RECORDS.inc(len(batch), outcome="dropped")
+        dropped = self.buffer.dropped
+        if dropped > self._reported_drops:
+            ANALYTICS_RECORDS.inc(dropped - self._reported_drops, outcome="dropped")
+            self._reported_drops = dropped
+        ANALYTICS_BUFFERED.set(len(self.buffer))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+
+ANALYTICS = AnalyticsLog(RotatingGzipWriter(ANALYTICS_DIR, "queries", ANALYTICS_ROTATE_BYTES, ANALYTICS_MAX_FILES))
+CAPTURE = AnalyticsLog(RotatingGzipWriter(ANALYTICS_DIR, "capture", ANALYTICS_ROTATE_BYTES, ANALYTICS_MAX_FILES))
+
+
+def record_query(message: str, tier: str, bot: str, started: float, transport: str = "chat", url: str = None):
+    """
+    Record one answered message. started is the time.monotonic() at which
+    the request arrived; url is the page chosen for page-tier answers.
+    """
+    if not ANALYTICS_ENABLED:
+        return
+    ANALYTICS.record({
+        "ts": round(time.time(), 3),
+        "tenant": TENANT,
+        "transport": transport,
+        "message": message,
+        "tier": tier,
+        "bot": bot,
+        "url": url,
+        "latency_ms": round((time.monotonic() - started) * 1000, 1),
+    })
+
+
+def capture_request(path: str, body: dict):
+    """
+    Record an incoming request as it arrives, before admission, so the
+    replay sees the traffic that was offered rather than what was served.
+    """
+    if not CAPTURE_ENABLED:
+        return
+    CAPTURE.record({"ts": round(time.time(), 3), "tenant": TENANT, "path": path, "body": body})
+
+
+def stop_analytics():
+    """
+    Flush and stop the writers. Called on app shutdown, since uvicorn
+    re-raises the stop signal and atexit handlers may not run.
+    """
+    ANALYTICS.stop()
+    CAPTURE.stop()
+
+
+# Start the writers when this module is imported
+if ANALYTICS_ENABLED:
+    ANALYTICS.start()
+if CAPTURE_ENABLED:
+    CAPTURE.start()
@@ -0,0 +1,166 @@
+"""
+Circuit breaker module for the chatbot system.
+This module tracks the health of each upstream host and stops sending
+requests to a host that is failing or too slow, probing it again after a
+cool-down period.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+from metrics import Counter, Gauge
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Number of recent calls the failure and slow-call rates are computed over
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+
+# Trip when this share of recent calls failed or were slower than BREAKER_SLOW_CALL_SECONDS
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "3.0"))
+
+# How long to stay open before letting probe requests through
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+BREAKER_STATE = Gauge(
+    "chatbot_circuit_state",
+    "Circuit breaker state per upstream host (0=closed, 1=half_open, 2=open)",
+    ("host",),
+)
+BREAKER_TRANSITIONS = Counter(
+    "chatbot_circuit_transitions_total",
+    "Circuit breaker state transitions per upstream host",
+    ("host", "from_state", "to_state"),
+)
+BREAKER_REJECTIONS = Counter(
+    "chatbot_circuit_rejections_total",
+    "Upstream calls skipped because the circuit was open",
+    ("host",),
+)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a host whose circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Failure-rate and latency based circuit breaker for one upstream host.
+    """
+    def __init__(self, host: str, clock=time.monotonic):
+        self.host = host
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        # Recent outcomes as (failed, slow) pairs
+        self.calls = deque(maxlen=BREAKER_WINDOW)
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(STATE_VALUES[CLOSED], host=host)
+
+    def _transition(self, new_state: str):
+        """
+        Move to a new state and record the transition. Caller holds the lock.
+        """
+        if new_state == self.state:
+            return
+        BREAKER_TRANSITIONS.inc(host=self.host, from_state=self.state, to_state=new_state)
+        BREAKER_STATE.set(STATE_VALUES[new_state], host=self.host)
+        self.state = new_state
+        self.probes_in_flight = 0
+        if new_state == OPEN:
+            self.opened_at = self.clock()
+        else:
+            self.calls.clear()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call to the host may be attempted now.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < BREAKER_OPEN_SECONDS:
+                    BREAKER_REJECTIONS.inc(host=self.host)
+                    return False
+                self._transition(HALF_OPEN)
+
+            if self.state == HALF_OPEN:
+                if self.probes_in_flight >= BREAKER_HALF_OPEN_PROBES:
+                    BREAKER_REJECTIONS.inc(host=self.host)
+                    return False
+                self.probes_in_flight += 1
+            return True
+
+    def record_success(self, latency: float):
+        """
+        Record a completed call and its latency.
+        """
+        slow = latency >= BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN if slow else CLOSED)
+                return
+            self.calls.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, latency: float = 0.0):
+        """
+        Record a failed call.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self.calls.append((True, latency >= BREAKER_SLOW_CALL_SECONDS))
+            self._evaluate()
+
+    def record_cancelled(self):
+        """
+        Record a call abandoned for reasons unrelated to the host, such as
+        the caller running out of time. Only frees a half-open probe slot.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self.probes_in_flight > 0:
+                self.probes_in_flight -= 1
+
+    def _evaluate(self):
+        """
+        Trip the breaker if the recent window is unhealthy. Caller holds the lock.
+        """
+        if self.state != CLOSED or len(self.calls) < BREAKER_MIN_CALLS:
+            return
+        total = len(self.calls)
+        failures = sum(1 for failed, _ in self.calls if failed)
+        slow = sum(1 for _, is_slow in self.calls if is_slow)
+        if failures / total >= BREAKER_FAILURE_RATE or slow / total >= BREAKER_SLOW_CALL_RATE:
+            self._transition(OPEN)
+
+
+# One breaker per upstream host
+BREAKERS = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """
+    Return the circuit breaker for the host of the given URL.
+    """
+    host = urlparse(url).netloc
+    breaker = BREAKERS.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = BREAKERS.get(host)
+            if breaker is None:
+                breaker = BREAKERS[host] = CircuitBreaker(host)
+    return breaker
@@ -1,8 +1,24 @@
 
+import hashlib
+import logging
 import os
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from circuit_breaker import CLOSED, CircuitOpenError, get_breaker
+from content_store import CONTENT_STORE, make_cursor
+from deadline import (MAX_CONNECT_TIMEOUT, MAX_UPSTREAM_TIMEOUT, BudgetExhausted, check_budget, request_budget,
+                      upstream_timeouts)
+from hedging import AttemptCancelled, hedged
+from html_text import iter_page_text, parse_html
+from latency import UPSTREAM_LATENCIES
+from local_corpus import LocalCorpus
+from metrics import Counter, Histogram
+from parse_pool import PARSE_POOL
+from sitemap import SitemapIndex
+from url_classifier import section_classifier
+
+logger = logging.getLogger(__name__)
 
 # URL mappings for different sections
 BASE_URL = "https://hrms.globaltechsoftwaresolutions.cloud/"
@@ -16,6 +32,43 @@ COMPANY_URL = os.getenv("COMPANY_URL", BASE_URL)
 # Crawled URLs cache
 CRAWLED_URLS = {}
 
+# Site sections found by crawling the main page's links, in match priority
+# order: (section, path keywords, URL used when no link matches)
+URL_SECTIONS = (
+    ("about", ("about",), ABOUT_URL),
+    ("contact", ("contact",), CONTACT_URL),
+    ("blog", ("blog", "news"), BLOGS_URL),
+    ("service", ("service", "product"), BASE_URL),
+)
+SECTION_RULES = tuple((section, keywords) for section, keywords, _ in URL_SECTIONS)
+
+# Sitemap listing the site's pages; set to "" to discover pages from links only
+SITEMAP_URL = os.getenv("SITEMAP_URL", BASE_URL + "sitemap.xml")
+
+# Reply used when a host is unavailable and nothing is cached for the page
+UNAVAILABLE_REPLY = "Our website is temporarily unavailable. Please try again later or contact support for assistance."
+
+# Longest page extract returned in a single chat reply
+CHAT_TEXT_LIMIT = 2000
+TRUNCATION_NOTE = "... (content truncated for chat display)"
+
+# Closes a summary reply; asking for more continues with the full page text
+SUMMARY_NOTE = " (summary of the page; ask for more to read it in full)"
+
+# Size of the text pieces sent by the streaming endpoints
+STREAM_CHUNK_SIZE = 256
+
+PAGES_INGESTED = Counter(
+    "chatbot_pages_ingested_total",
+    "Fetched page bodies by outcome (unchanged body, unchanged text or changed)",
+    ("outcome",),
+)
+REFRESH_SECONDS = Histogram("chatbot_refresh_seconds", "Duration of a full content refresh")
+SUMMARY_SECONDS = Histogram("chatbot_summary_seconds", "Time to summarize one page's text",
+                            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+REFRESH_SUMMARY_SECONDS = Histogram("chatbot_refresh_summary_seconds", "Time spent summarizing pages in a full content refresh")
+LASTMOD_SKIPS = Counter("chatbot_lastmod_skips_total", "Page refreshes skipped because the sitemap lastmod had not moved")
+
 # Local testing mode
 LOCAL_TESTING = os.getenv("LOCAL_TESTING", "false").lower() == "true"
 LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR", "./local_data")
@@ -90,76 +143,186 @@ def is_company_related(message: str) -> bool:
     return any(keyword in message for keyword in COMPANY_KEYWORDS)
 
 
-def crawl_relevant_pages(base_url: str) -> dict:
+def _read_body(response: "requests.Response", cancel_event=None) -> bytes:
     """
-    Crawl the website to discover relevant pages and their content.
+    Read a streamed response body, giving up if the request budget runs out
+    or another attempt has already won.
+    """
+    chunks = []
+    for chunk in response.iter_content(chunk_size=16384):
+        chunks.append(chunk)
+        check_budget()
+        if cancel_event is not None and cancel_event.is_set():
+            raise AttemptCancelled("Another attempt finished first")
+    return b"".join(chunks)
+
+
+def _download(url: str, timeout: tuple, cancel_event=None) -> str:
+    """
+    Perform one GET attempt and return the decoded body.
+    """
+    import requests
+    response = requests.get(url, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        body = _read_body(response, cancel_event)
+    finally:
+        response.close()
+    return body.decode(response.encoding or "utf-8", errors="replace")
+
+
+def fetch_page(url: str) -> str:
+    """
+    Fetch a page through its host's circuit breaker and return its HTML.
+
+    Timeouts come from the current request's latency budget and the host's
+    observed latency, and slow attempts may be hedged. Raises CircuitOpenError
+    without touching the network while the host is unavailable, and
+    BudgetExhausted when out of time.
+    """
+    # Loaded on first fetch, so processes that only serve static replies never import it
+    import requests
+    connect_timeout, read_timeout, budget_limited = upstream_timeouts(url)
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {breaker.host}")
+
+    timeout = (connect_timeout, read_timeout)
+    started = time.monotonic()
+    try:
+        if breaker.state == CLOSED:
+            html = hedged(breaker.host, lambda cancel_event: _download(url, timeout, cancel_event))
+        else:
+            # Half-open probes are never hedged
+            html = _download(url, timeout)
+    except requests.HTTPError as e:
+        # A 4xx means the host is up; only server errors count against it
+        if e.response is not None and e.response.status_code < 500:
+            breaker.record_success(time.monotonic() - started)
+        else:
+            breaker.record_failure(time.monotonic() - started)
+        raise
+    except BudgetExhausted:
+        breaker.record_cancelled()
+        raise
+    except requests.Timeout as e:
+        if budget_limited:
+            # We cut the host off early to stay within budget; not its fault
+            breaker.record_cancelled()
+            raise BudgetExhausted(f"Latency budget exhausted fetching {url}") from e
+        elapsed = time.monotonic() - started
+        breaker.record_failure(elapsed)
+        # Keep the timeout as a (censored) sample so the adaptive timeout can grow
+        UPSTREAM_LATENCIES.record(breaker.host, elapsed)
+        raise
+    except Exception:
+        breaker.record_failure(time.monotonic() - started)
+        raise
+
+    elapsed = time.monotonic() - started
+    breaker.record_success(elapsed)
+    UPSTREAM_LATENCIES.record(breaker.host, elapsed)
+    return html
+
+
+@contextmanager
+def open_sitemap(url: str):
+    """
+    Open a sitemap as a binary stream for the streaming parser, from the
+    local data directory in local testing mode.
+    """
+    if LOCAL_TESTING:
+        name = urlparse(url).path.rstrip("/").split("/")[-1] or "sitemap.xml"
+        with open(os.path.join(LOCAL_DATA_DIR, name), "rb") as stream:
+            yield stream
+        return
+    import requests
+    response = requests.get(url, timeout=(MAX_CONNECT_TIMEOUT, MAX_UPSTREAM_TIMEOUT), stream=True)
+    try:
+        response.raise_for_status()
+        # Let urllib3 undo any Content-Encoding while the parser reads
+        response.raw.decode_content = True
+        if urlparse(url).path.endswith(".gz"):
+            import gzip
+            with gzip.GzipFile(fileobj=response.raw) as stream:
+                yield stream
+        else:
+            yield response.raw
+    finally:
+        response.close()
+
+
+def classify_page(url: str):
+    """
+    Site section a page URL belongs to, or None.
+    """
+    return section_classifier(BASE_URL, SECTION_RULES).classify(url)
+
+
+# Section pages and lastmod times from the site's sitemap, when it has one
+SITEMAP = SitemapIndex(open_sitemap, classify_page, track=(BASE_URL, COMPANY_URL))
+
+
+def sitemap_sections():
+    """
+    Read the sitemap and return {section: URL} from it, or None when the
+    site has no usable sitemap.
+    """
+    if not SITEMAP_URL:
+        return None
+    return SITEMAP.read(SITEMAP_URL)
+
+
+def store_sections(found: dict) -> dict:
+    """
+    Fill in default URLs for sections that were not found and replace
+    CRAWLED_URLS in place, so concurrent readers never see it empty.
+    """
+    for section, _, default_url in URL_SECTIONS:
+        found.setdefault(section, default_url)
+    CRAWLED_URLS.update(found)
+    for section in set(CRAWLED_URLS) - set(found):
+        del CRAWLED_URLS[section]
+    return CRAWLED_URLS
+
+
+def crawl_relevant_pages(base_url: str, html: str = None) -> dict:
+    """
+    Discover the site's section pages by crawling the main page's links.
+    Passing the main page's html re-indexes its links even if already crawled.
+
+    The sitemap is only read by the refresh pipeline (refresh_pages and
+    refresh_sitemap), never here: this runs on request threads, where the
+    main page fetch stays within the request budget and circuit breaker.
     """
-    global CRAWLED_URLS
-    
     # If we've already crawled, return cached results
-    if CRAWLED_URLS:
+    if CRAWLED_URLS and html is None:
         return CRAWLED_URLS
     
     try:
         # Fetch the main page
-        response = requests.get(base_url, timeout=10)
-        response.raise_for_status()
-        
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if html is None:
+            html = fetch_page(base_url)
         
-        # Find all links
-        links = soup.find_all('a', href=True)
-        
-        # Process each link
-        for link in links:
-            href = str(link['href'])
-            # Convert relative URLs to absolute
-            absolute_url = urljoin(base_url, href)
-            
-            # Only process URLs from the same domain
-            if urlparse(absolute_url).netloc == urlparse(base_url).netloc:
-                # Check if this is a relevant page based on common patterns
-                path = urlparse(absolute_url).path.lower()
-                if 'about' in path:
-                    CRAWLED_URLS['about'] = absolute_url
-                elif 'contact' in path:
-                    CRAWLED_URLS['contact'] = absolute_url
-                elif 'blog' in path or 'news' in path:
-                    CRAWLED_URLS['blog'] = absolute_url
-                elif 'service' in path or 'product' in path:
-                    CRAWLED_URLS['service'] = absolute_url
-        
-        # Set defaults if not found
-        if 'about' not in CRAWLED_URLS:
-            CRAWLED_URLS['about'] = ABOUT_URL
-        if 'contact' not in CRAWLED_URLS:
-            CRAWLED_URLS['contact'] = CONTACT_URL
-        if 'blog' not in CRAWLED_URLS:
-            CRAWLED_URLS['blog'] = BLOGS_URL
-        if 'service' not in CRAWLED_URLS:
-            CRAWLED_URLS['service'] = BASE_URL
-            
-        return CRAWLED_URLS
+        # Classify every same-site link by the section its path names
+        classifier = section_classifier(base_url, SECTION_RULES)
+        found = classifier.classify_links(PARSE_POOL.links(html))
     except Exception as e:
         # Fallback to hardcoded URLs if crawling fails
-        CRAWLED_URLS = {
-            'about': ABOUT_URL,
-            'contact': CONTACT_URL,
-            'blog': BLOGS_URL,
-            'service': BASE_URL
-        }
-        return CRAWLED_URLS
+        found = {}
+    return store_sections(found)
 
 
-def select_relevant_url(message: str) -> str:
+def select_relevant_url(message: str, crawl: bool = True) -> str:
     """
     Select the most relevant URL based on the user's message.
+    With crawl=False, sections not discovered yet fall back to their
+    default URLs instead of crawling the site first.
     """
     message_lower = message.lower()
     
     # Crawl the website to find relevant pages
-    crawled_urls = crawl_relevant_pages(BASE_URL)
+    crawled_urls = crawl_relevant_pages(BASE_URL) if crawl else CRAWLED_URLS
     
     # Check for specific section keywords
     if any(keyword in message_lower for keyword in ABOUT_KEYWORDS):
@@ -173,12 +336,234 @@ def select_relevant_url(message: str) -> str:
         return COMPANY_URL
 
 
-def fetch_local_content(url: str) -> str:
+def truncate_for_chat(pieces):
     """
-    Fetch content from local files for testing purposes.
+    Pass text pieces through until CHAT_TEXT_LIMIT characters, then close
+    with the truncation note.
+    """
+    emitted = 0
+    for piece in pieces:
+        if emitted + len(piece) > CHAT_TEXT_LIMIT:
+            yield piece[:CHAT_TEXT_LIMIT - emitted] + TRUNCATION_NOTE
+            return
+        emitted += len(piece)
+        yield piece
+
+
+def extract_text(html: str) -> str:
+    """
+    Parse a raw page body and extract its full cleaned-up text, in the parse
+    pool if the page is large.
+    """
+    return PARSE_POOL.extract(html, with_summary=False)[0]
+
+
+def extract_page(html: str, stats: dict = None) -> tuple:
+    """
+    Parse a raw page body and return (text, summary): its full cleaned-up
+    text and extractive summary, computed in the parse pool if the page is
+    large. The time spent summarizing is added to stats["summary_seconds"]
+    when stats is given.
+    """
+    text, summary, seconds = PARSE_POOL.extract(html)
+    if seconds is not None:
+        SUMMARY_SECONDS.observe(seconds)
+        if stats is not None:
+            stats["summary_seconds"] = stats.get("summary_seconds", 0.0) + seconds
+    return text, summary
+
+
+def body_hash(html: str) -> str:
+    """
+    Hash a raw page body for change detection.
+    """
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def extract_page_once(url: str, html: str, digest: str, stats: dict = None) -> tuple:
+    """
+    Return (text, summary) for a page body. In local mode the local corpus
+    has already extracted the file, so its result is reused when the body
+    is the same.
+    """
+    if LOCAL_TESTING:
+        local = LOCAL_CORPUS.get(local_file_name(url))
+        if local is not None and local.body_hash == digest:
+            return local.text, local.summary
+    return extract_page(html, stats)
+
+
+def ingest_page(url: str, html: str, with_summary: bool = True, stats: dict = None, text: str = None) -> tuple:
+    """
+    Store a fetched page body, extracting its text (and, unless with_summary
+    is False, its summary) only if the body changed since the last fetch.
+    The request path skips the summary; the next refresh of the page adds
+    it. Without a summary, text may pass in text already extracted from
+    html (the streaming path extracts as it sends). Returns (PageText,
+    changed), where changed is True when the extracted text differs from
+    what was stored.
+    """
+    digest = body_hash(html)
+    page = CONTENT_STORE.get(url)
+    if page is not None and page.body_hash == digest and (page.summary is not None or not with_summary):
+        PAGES_INGESTED.inc(outcome="unchanged_body")
+        return page, False
+    if with_summary:
+        text, summary = extract_page_once(url, html, digest, stats)
+    else:
+        text, summary = extract_text(html) if text is None else text, None
+    stored = CONTENT_STORE.put(url, text, digest, summary)
+    # Markup-only edits (new asset hashes, timestamps) keep the old text and its cursors
+    changed = stored is not page
+    PAGES_INGESTED.inc(outcome="changed" if changed else "unchanged_text")
+    return stored, changed
+
+
+def refresh_targets() -> set:
+    """
+    URLs kept fresh by the refresh scheduler: the sitemap, the main page and
+    every section page.
+    """
+    targets = {BASE_URL, COMPANY_URL} | set(CRAWLED_URLS.values())
+    if SITEMAP_URL:
+        targets.add(SITEMAP_URL)
+    return targets
+
+
+def refresh_sitemap() -> bool:
+    """
+    Re-read the sitemap, re-index the sections it lists and refetch the
+    pages whose lastmod moved since they were last fetched. Pages without a
+    lastmod are left to their own scheduled refresh. Returns True when any
+    page text changed.
+    """
+    found = sitemap_sections()
+    if found is None:
+        return False
+    store_sections(found)
+    changed = False
+    for url in sorted(set(SITEMAP.lastmod) & refresh_targets()):
+        if SITEMAP.is_current(url) and CONTENT_STORE.get(url) is not None:
+            continue
+        try:
+            changed = refresh_page(url) or changed
+        except Exception as e:
+            logger.error(f"Error refreshing {url}: {str(e)}")
+    return changed
+
+
+def refresh_page(url: str, stats: dict = None) -> bool:
+    """
+    Re-fetch one page and re-index and re-summarize it if its content
+    changed. Returns True when the extracted text changed. Pages the sitemap
+    shows unchanged since they were last fetched are not fetched at all.
+    """
+    if url == SITEMAP_URL:
+        return refresh_sitemap()
+    if SITEMAP.is_current(url) and CONTENT_STORE.get(url) is not None:
+        LASTMOD_SKIPS.inc()
+        return False
+    html = read_local_page(url) if LOCAL_TESTING else fetch_page(url)
+    # The section links only need re-indexing when the main page changed and there is no sitemap
+    if url == BASE_URL and not SITEMAP.available:
+        previous = CONTENT_STORE.get(url)
+        if previous is None or previous.body_hash != body_hash(html) or not CRAWLED_URLS:
+            crawl_relevant_pages(BASE_URL, html)
+    _, changed = ingest_page(url, html, stats=stats)
+    SITEMAP.mark_fetched(url)
+    return changed
+
+
+def refresh_pages() -> dict:
+    """
+    Re-fetch the main page and every section page, re-extracting and
+    re-indexing only what changed. With a sitemap, sections come from it
+    and pages whose lastmod has not moved are skipped; without one, they
+    come from the main page's links. Returns counts per outcome and the
+    time spent summarizing.
+    """
+    started = time.monotonic()
+    stats = {"fetched": 0, "changed": 0, "skipped": 0, "errors": 0, "summary_seconds": 0.0}
+    found = sitemap_sections()
+    if found is not None:
+        store_sections(found)
+        urls = sorted(refresh_targets() - {SITEMAP_URL})
+    else:
+        urls = [BASE_URL]
+    while urls:
+        url = urls.pop(0)
+        if SITEMAP.is_current(url) and CONTENT_STORE.get(url) is not None:
+            LASTMOD_SKIPS.inc()
+            stats["skipped"] += 1
+            continue
+        try:
+            stats["changed"] += refresh_page(url, stats)
+            stats["fetched"] += 1
+        except Exception as e:
+            logger.error(f"Error refreshing {url}: {str(e)}")
+            stats["errors"] += 1
+        if url == BASE_URL and found is None:
+            # Falls back to the hardcoded section URLs if the main page failed
+            crawl_relevant_pages(BASE_URL)
+            urls = sorted(refresh_targets() - {BASE_URL, SITEMAP_URL})
+
+    REFRESH_SECONDS.observe(time.monotonic() - started)
+    REFRESH_SUMMARY_SECONDS.observe(stats["summary_seconds"])
+    stats["summary_seconds"] = round(stats["summary_seconds"], 4)
+    return stats
+
+
+def page_slice(page, offset: int = 0) -> tuple:
+    """
+    Return (reply, next_offset) for the chat-sized slice of a stored page's
+    text starting at offset. next_offset is None when nothing is left.
+    """
+    end = offset + CHAT_TEXT_LIMIT
+    if end < len(page.text):
+        return page.text[offset:end] + TRUNCATION_NOTE, end
+    return page.text[offset:], None
+
+
+def page_reply(page) -> str:
+    """
+    First reply for a stored page: its precomputed summary when it has one,
+    otherwise the first chat-sized slice of its text.
+    """
+    if page.summary:
+        return page.summary + SUMMARY_NOTE
+    return page_slice(page)[0]
+
+
+def first_offset(url: str) -> int:
+    """
+    Offset in the text of url that follows its first reply: the start of the
+    page after a summary, otherwise the end of the first slice.
+    """
+    page = CONTENT_STORE.get(url)
+    return 0 if page is not None and page.summary else CHAT_TEXT_LIMIT
+
+
+def next_cursor(url: str, offset: int = None):
+    """
+    Return a cursor to the text of url after offset (by default, after the
+    first reply), or None if there is no more.
+    """
+    if offset is None:
+        offset = first_offset(url)
+    page = CONTENT_STORE.get(url)
+    if page is None or offset >= len(page.text):
+        return None
+    return make_cursor(page, offset)
+
+
+# Local test files, loaded and extracted once and re-read only when they change
+LOCAL_CORPUS = LocalCorpus(LOCAL_DATA_DIR, extract_page, body_hash)
+
+
+def local_file_name(url: str) -> str:
+    """
+    Name of the local HTML file standing in for a URL.
     """
-    import os
-    
     # Map URLs to local file names
     url_mapping = {
         BASE_URL: "index.html",
@@ -186,40 +571,41 @@ def fetch_local_content(url: str) -> str:
         CONTACT_URL: "contact.html",
         BLOGS_URL: "blogs.html"
     }
+    if url in url_mapping:
+        return url_mapping[url]
+    # Other pages are looked up by their last path segment, e.g. /pricing -> pricing.html
+    segment = urlparse(url).path.rstrip("/").split("/")[-1]
+    if segment and f"{segment}.html" in LOCAL_CORPUS:
+        return f"{segment}.html"
+    return "index.html"
+
+
+def read_local_page(url: str) -> str:
+    """
+    Read the raw HTML of a page from local files for testing purposes.
+    """
+    file_path = os.path.join(LOCAL_DATA_DIR, local_file_name(url))
     
+    # Read the local HTML file
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def fetch_local_content(url: str) -> str:
+    """
+    Fetch content from local files for testing purposes, from the
+    in-memory corpus rather than disk.
+    """
     try:
-        # Determine which file to read based on the URL
-        file_name = url_mapping.get(url, "index.html")
-        file_path = os.path.join(LOCAL_DATA_DIR, file_name)
-        
-        # Check if file exists
-        if not os.path.exists(file_path):
+        file_name = local_file_name(url)
+        local = LOCAL_CORPUS.get(file_name)
+        if local is None:
+            file_path = os.path.join(LOCAL_DATA_DIR, file_name)
             return f"Local file not found: {file_path}. Please create local test files for testing."
-        
-        # Read the local HTML file
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Parse HTML content
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extract text content and clean it up
-        text_content = soup.get_text()
-        
-        # Clean up whitespace
-        lines = [line.strip() for line in text_content.splitlines()]
-        chunks = [phrase for line in lines for phrase in line.split("  ")]
-        cleaned_text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Limit response size for chat
-        if len(cleaned_text) > 2000:
-            cleaned_text = cleaned_text[:2000] + "... (content truncated for chat display)"
-        
-        return cleaned_text
+        page = CONTENT_STORE.get(url)
+        if page is None or page.body_hash != local.body_hash or page.summary is None:
+            page = CONTENT_STORE.put(url, local.text, local.body_hash, local.summary)
+        return page_reply(page)
     except Exception as e:
         return f"Error reading local content: {str(e)}"
 
@@ -230,35 +616,88 @@ def fetch_company_info(user_message: str = "") -> str:
     """
     # Select the most relevant URL
     url_to_fetch = select_relevant_url(user_message) if user_message else COMPANY_URL
-    
+    return fetch_page_info(url_to_fetch)
+
+
+def fetch_page_info(url_to_fetch: str) -> str:
+    """
+    Return the cleaned-up text of one section page, from the content store
+    when it has been fetched before, otherwise fetched live.
+    """
     # Check if we're in local testing mode
     if LOCAL_TESTING:
         return fetch_local_content(url_to_fetch)
     
+    # Pages warmed at startup are kept fresh by the refresh scheduler
+    page = CONTENT_STORE.get(url_to_fetch)
+    if page is not None:
+        return page_reply(page)
+    
     try:
-        response = requests.get(url_to_fetch, timeout=10)
-        response.raise_for_status()
-        
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extract text content and clean it up
-        text_content = soup.get_text()
+        html = fetch_page(url_to_fetch)
         
-        # Clean up whitespace
-        lines = [line.strip() for line in text_content.splitlines()]
-        chunks = [phrase for line in lines for phrase in line.split("  ")]
-        cleaned_text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Limit response size for chat
-        if len(cleaned_text) > 2000:
-            cleaned_text = cleaned_text[:2000] + "... (content truncated for chat display)"
-        
-        return cleaned_text
+        # Parse HTML content and keep the full text for continuations
+        page, _ = ingest_page(url_to_fetch, html, with_summary=False)
+        return page_reply(page)
+    except (CircuitOpenError, BudgetExhausted):
+        # Host is known to be down or we are out of time; answer from the last good text
+        page = CONTENT_STORE.get(url_to_fetch)
+        return page_reply(page) if page is not None else UNAVAILABLE_REPLY
     except Exception as e:
+        page = CONTENT_STORE.get(url_to_fetch)
+        if page is not None:
+            return page_reply(page)
         # Minimal fallback if fetch fails
         return f"Unable to fetch company information at this time. Please try again later or contact support. (Error: {str(e)})"
+
+
+def iter_page_info(url_to_fetch: str, started: float = None):
+    """
+    Stream the text of one section page as pieces.
+
+    Text cached for the page is sent straight away. Otherwise the page is
+    fetched within the request's latency budget (counted from `started`) and
+    its text streamed in STREAM_CHUNK_SIZE pieces as it is extracted.
+    """
+    if LOCAL_TESTING:
+        yield fetch_local_content(url_to_fetch)
+        return
+
+    page = CONTENT_STORE.get(url_to_fetch)
+    if page is not None:
+        yield page_reply(page)
+        return
+
+    # The budget must not stay open across a yield: each resumption may run in another context
+    try:
+        with request_budget(started=started):
+            html = fetch_page(url_to_fetch)
+    except (CircuitOpenError, BudgetExhausted):
+        yield UNAVAILABLE_REPLY
+        return
+    except Exception as e:
+        yield f"Unable to fetch company information at this time. Please try again later or contact support. (Error: {str(e)})"
+        return
+
+    pieces = []
+
+    def collect():
+        # Large pages are parsed whole in the pool; small ones stream as they are walked
+        source = (extract_text(html),) if PARSE_POOL.offloads(html) else iter_page_text(parse_html(html))
+        for piece in source:
+            pieces.append(piece)
+            yield piece
+
+    extracted = collect()
+    buffered = ""
+    for piece in truncate_for_chat(extracted):
+        buffered += piece
+        if len(buffered) >= STREAM_CHUNK_SIZE:
+            yield buffered
+            buffered = ""
+    if buffered:
+        yield buffered
+    # Finish extracting the rest of the page so it can be continued later
+    for _ in extracted:
+        pass
+    ingest_page(url_to_fetch, html, with_summary=False, text="".join(pieces))
@@ -0,0 +1,93 @@
+"""
+Deadline module for the chatbot system.
+This module carries an end-to-end latency budget for each chat request and
+derives upstream connect/read timeouts from what is left of it and from the
+observed latency of the upstream host.
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from latency import UPSTREAM_LATENCIES
+
+# Total time a /chat request may take, including time spent queued
+CHAT_BUDGET_SECONDS = float(os.getenv("CHAT_BUDGET_SECONDS", "3.0"))
+
+# Upper bound for any upstream timeout (the old fixed value)
+MAX_UPSTREAM_TIMEOUT = float(os.getenv("MAX_UPSTREAM_TIMEOUT", "10.0"))
+MAX_CONNECT_TIMEOUT = float(os.getenv("MAX_CONNECT_TIMEOUT", "2.0"))
+
+# Never start an upstream call with less than this much time left
+MIN_UPSTREAM_TIMEOUT = float(os.getenv("MIN_UPSTREAM_TIMEOUT", "0.1"))
+
+# Adaptive read timeout is this multiple of the host's p99 latency, but never below the floor
+TIMEOUT_P99_MULTIPLIER = float(os.getenv("TIMEOUT_P99_MULTIPLIER", "2.0"))
+MIN_ADAPTIVE_TIMEOUT = float(os.getenv("MIN_ADAPTIVE_TIMEOUT", "1.0"))
+
+_deadline = contextvars.ContextVar("chat_deadline", default=None)
+
+
+class BudgetExhausted(Exception):
+    """
+    Raised when a request has no time left for upstream work.
+    """
+
+
+@contextmanager
+def request_budget(seconds: float = CHAT_BUDGET_SECONDS, started: float = None):
+    """
+    Run the enclosed block under a deadline of `seconds` from `started`
+    (a time.monotonic() value, defaulting to now).
+    """
+    start = time.monotonic() if started is None else started
+    token = _deadline.set(start + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    Seconds left in the current request's budget, or None without a budget.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_budget():
+    """
+    Raise BudgetExhausted if the current budget has run out.
+    """
+    left = remaining()
+    if left is not None and left < MIN_UPSTREAM_TIMEOUT:
+        raise BudgetExhausted(f"Latency budget exhausted ({left:.3f}s left)")
+
+
+def upstream_timeouts(url: str) -> tuple:
+    """
+    Compute (connect_timeout, read_timeout, budget_limited) for a fetch.
+
+    The read timeout adapts to the host's observed p99 latency and both are
+    capped by the time left in the request budget. budget_limited tells the
+    caller whether a timeout would be the request's fault rather than the host's.
+    """
+    host = urlparse(url).netloc
+    p99 = UPSTREAM_LATENCIES.percentile(host, 99)
+    if p99 is None:
+        read_timeout = MAX_UPSTREAM_TIMEOUT
+    else:
+        read_timeout = min(MAX_UPSTREAM_TIMEOUT, max(MIN_ADAPTIVE_TIMEOUT, p99 * TIMEOUT_P99_MULTIPLIER))
+    connect_timeout = min(MAX_CONNECT_TIMEOUT, read_timeout)
+
+    left = remaining()
+    if left is None:
+        return connect_timeout, read_timeout, False
+    if left < MIN_UPSTREAM_TIMEOUT:
+        raise BudgetExhausted(f"Latency budget exhausted ({left:.3f}s left)")
+    budget_limited = left < read_timeout
+    return min(connect_timeout, left), min(read_timeout, left), budget_limited
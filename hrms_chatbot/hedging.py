@@ -0,0 +1,120 @@
+"""
+Hedging module for the chatbot system.
+This module sends a second attempt for a slow upstream fetch once the first
+has been outstanding longer than the host's p95 latency, and uses whichever
+attempt finishes first. A global budget caps the extra load hedging adds.
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from latency import UPSTREAM_LATENCIES
+from metrics import Counter
+
+# Hedging is opt-in
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+
+# Send the hedge once the first attempt is slower than this percentile
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+
+# Hedges may add at most this fraction of extra upstream requests
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "5"))
+
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "32"))
+
+HEDGES_SENT = Counter("chatbot_hedges_sent_total", "Hedged upstream attempts sent", ("host",))
+HEDGES_WON = Counter("chatbot_hedges_won_total", "Hedged attempts that finished first", ("host",))
+HEDGES_DENIED = Counter("chatbot_hedges_denied_total", "Hedges skipped because the budget was spent", ("host",))
+
+
+class AttemptCancelled(Exception):
+    """
+    Raised inside an attempt that lost the race to another attempt.
+    """
+
+
+class HedgeBudget:
+    """
+    Token budget: every primary request earns `ratio` tokens, every hedge
+    spends one, so hedges stay under `ratio` of total traffic.
+    """
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+HEDGE_BUDGET = HedgeBudget(HEDGE_BUDGET_RATIO, HEDGE_BUDGET_BURST)
+
+_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+
+
+def _submit(attempt, cancel_event: threading.Event):
+    """
+    Run an attempt on the hedge pool in a copy of the caller's context, so
+    the request's latency budget follows it.
+    """
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, attempt, cancel_event)
+
+
+def hedged(host: str, attempt):
+    """
+    Run attempt(cancel_event) and, if it is slow, race a second attempt.
+
+    Attempts must be idempotent and should raise AttemptCancelled promptly
+    once their cancel event is set. Without enough latency history for the
+    host, or with hedging disabled, the attempt simply runs inline.
+    """
+    if not HEDGING_ENABLED:
+        return attempt(threading.Event())
+
+    HEDGE_BUDGET.earn()
+    delay = UPSTREAM_LATENCIES.percentile(host, HEDGE_PERCENTILE)
+    if delay is None:
+        return attempt(threading.Event())
+
+    primary_cancel = threading.Event()
+    primary = _submit(attempt, primary_cancel)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    if not HEDGE_BUDGET.spend():
+        HEDGES_DENIED.inc(host=host)
+        return primary.result()
+
+    HEDGES_SENT.inc(host=host)
+    hedge_cancel = threading.Event()
+    hedge = _submit(attempt, hedge_cancel)
+    pending = {primary: primary_cancel, hedge: hedge_cancel}
+    error = None
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                error = e
+                continue
+            # Tell the loser to stop reading and drop its connection
+            for cancel_event in pending.values():
+                cancel_event.set()
+            if future is hedge:
+                HEDGES_WON.inc(host=host)
+            return result
+    raise error
@@ -0,0 +1,107 @@
+"""
+HTML text module for the chatbot system.
+This module turns a raw page body into what the bot keeps of it: the
+cleaned-up text, its extractive summary, or the page's links. It holds no
+app state and imports nothing from the app beyond the summarizer, so parse
+worker processes (see parse_pool.py) can import it cheaply. The *_body
+functions are the worker entry points: they take the page as UTF-8 bytes
+and return only plain strings, never parse trees.
+"""
+
+import time
+from summarizer import SUMMARY_MAX_CHARS, summarize
+
+
+def parse_html(html: str) -> "BeautifulSoup":
+    """
+    Parse a page with BeautifulSoup. The parser is imported on first use so
+    processes that only serve static replies never load it.
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+
+def iter_page_text(soup: "BeautifulSoup"):
+    """
+    Yield the full cleaned-up text of a parsed page piece by piece.
+    Joining the pieces gives the same text as cleaning soup.get_text() in one
+    go, but early pieces are available before the whole page is walked.
+    """
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    def phrases():
+        # Clean up whitespace a line at a time as the text streams in. Only
+        # each new string is split; the pieces of a line that has not ended
+        # yet are kept in a list and joined once, so minified pages with no
+        # line breaks stay linear.
+        pending = []
+        for string in soup.strings:
+            lines = string.splitlines(keepends=True)
+            if not lines:
+                continue
+            # Hold back a trailing partial line until its end arrives
+            partial = lines.pop() if lines[-1].splitlines()[0] == lines[-1] else None
+            if lines and pending:
+                pending.append(lines[0])
+                lines[0] = "".join(pending)
+                pending = []
+            if partial is not None:
+                pending.append(partial)
+            for line in lines:
+                for phrase in line.strip().split("  "):
+                    if phrase:
+                        yield phrase
+        for phrase in "".join(pending).strip().split("  "):
+            if phrase:
+                yield phrase
+
+    for index, phrase in enumerate(phrases()):
+        yield phrase if index == 0 else " " + phrase
+
+
+def extract(html: str, with_summary: bool = True) -> tuple:
+    """
+    Parse a raw page body and return (text, summary, summary_seconds).
+    summary is "" when the text is short enough to be shown whole, and None
+    when with_summary is False; summary_seconds is None when no summary was
+    computed.
+    """
+    pieces = list(iter_page_text(parse_html(html)))
+    text = "".join(pieces)
+    if not with_summary:
+        return text, None, None
+    if len(text) <= SUMMARY_MAX_CHARS:
+        return text, "", None
+    started = time.perf_counter()
+    summary = summarize(pieces)
+    return text, summary, time.perf_counter() - started
+
+
+def page_links(html: str) -> list:
+    """
+    The href of every link on a page, in document order.
+    """
+    return [str(link['href']) for link in parse_html(html).find_all('a', href=True)]
+
+
+def extract_body(body: bytes, with_summary: bool = True) -> tuple:
+    """
+    extract() for a page sent as UTF-8 bytes.
+    """
+    return extract(body.decode("utf-8"), with_summary)
+
+
+def page_links_body(body: bytes) -> list:
+    """
+    page_links() for a page sent as UTF-8 bytes.
+    """
+    return page_links(body.decode("utf-8"))
+
+
+def warm_worker():
+    """
+    Import the parser in a new worker process so its first page is not slowed down.
+    """
+    import bs4  # noqa: F401
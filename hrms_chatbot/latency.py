@@ -0,0 +1,60 @@
+"""
+Latency tracking module for the chatbot system.
+This module keeps a rolling window of recent upstream fetch latencies per
+host so timeouts and hedging delays can follow what each host actually does.
+"""
+
+import os
+import threading
+from collections import deque
+from metrics import Histogram
+
+# Number of recent samples kept per host
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "200"))
+
+# Percentiles are only trusted once this many samples have been seen
+LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "20"))
+
+UPSTREAM_LATENCY = Histogram(
+    "chatbot_upstream_latency_seconds",
+    "Latency of successful upstream page fetches",
+    ("host",),
+)
+
+
+class LatencyTracker:
+    """
+    Rolling window of latency samples per host.
+    """
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = LATENCY_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, seconds: float):
+        """
+        Add a latency sample for a host.
+        """
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+        UPSTREAM_LATENCY.observe(seconds, host=host)
+
+    def percentile(self, host: str, pct: float):
+        """
+        Return the pct-th percentile latency for a host, or None while there
+        are too few samples to be meaningful.
+        """
+        with self._lock:
+            samples = self._samples.get(host)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        rank = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+UPSTREAM_LATENCIES = LatencyTracker()
@@ -1,15 +1,59 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from company_logic import is_company_related, fetch_company_info
-from microbots import get_microbot_response
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from company_logic import (fetch_page_info, first_offset, is_company_related, iter_page_info, next_cursor,
+                           page_slice, select_relevant_url)
+from content_store import CONTENT_STORE, make_cursor
+from microbots import get_relevant_microbot
+from faq import lookup_faq
+from spelling import correct_typos
+from compression import reply_response
+from admission import admit, size_threadpool
+from analytics import capture_request, record_query, stop_analytics
+from deadline import request_budget
+from metrics import render as render_metrics
+from streaming import serve_websocket, sse_response
+from sessions import SESSIONS, is_follow_up
+from warmup import WARMUP
+from admin import router as admin_router
+from profiler import tag_iter, tagged_by_tier
+from parse_pool import PARSE_POOL
 # Import scheduler to start background updates
 import scheduler
 
 class Message(BaseModel):
     message: str
+    # Client-generated ID; when present, follow-ups are answered from context
+    session_id: Optional[str] = None
 
-app = FastAPI()
+class ContinueRequest(BaseModel):
+    # Cursor returned with the previous slice of a long page answer
+    cursor: str
+    session_id: Optional[str] = None
+
+FALLBACK_REPLY = "Please contact admin for more details."
+END_OF_PAGE_REPLY = "That's everything I have on this topic. Please contact admin for more details."
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One worker thread per bulkhead slot, so page fetches cannot starve fast replies
+    size_threadpool()
+    # Start the parse worker processes before warm-up hands them pages
+    PARSE_POOL.start()
+    # Warm caches in the background; /ready reports when it is done
+    WARMUP.start()
+    yield
+    # Write out buffered analytics and capture records before the process exits
+    stop_analytics()
+    PARSE_POOL.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(admin_router)
 
 # Add CORS middleware
 app.add_middleware(
@@ -20,25 +64,242 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.post("/chat")
-def chat(data: Message):
+def route_message(user_msg: str) -> tuple:
+    """
+    Route a message to the tier that will answer it. Returns (tier, answerer):
+    the FAQ entry for "faq", the microbot for "microbot", the message with
+    misspelled keywords corrected for "page" (the page is picked from it),
+    otherwise None.
+    """
+    entry = lookup_faq(user_msg)
+    if entry is not None:
+        return "faq", entry
+    bot = get_relevant_microbot(user_msg)
+    if bot:
+        return "microbot", bot
+    # Retry with misspelled keywords corrected when nothing matches as typed
+    corrected = correct_typos(user_msg)
+    if corrected != user_msg.lower():
+        bot = get_relevant_microbot(corrected)
+        if bot:
+            return "microbot", bot
+    if is_company_related(corrected):
+        return "page", corrected
+    return "fallback", None
+
+async def admit_chat(data: Message, request: Request):
+    """
+    Rate limit and queue chat requests before they take a worker thread.
+    """
+    # The latency budget starts when the request arrives, before any queueing
+    request.state.received_at = time.monotonic()
+    capture_request(request.url.path, data.model_dump())
+
+    async def route():
+        # Route once, off the event loop; the handler answers from this route
+        request.state.route = await run_in_threadpool(route_message, data.message.strip())
+        return request.state.route[0]
+
+    async with admit(request, route):
+        yield
+
+async def admit_continue(data: ContinueRequest, request: Request):
+    """
+    Rate limit and queue continuation requests before they take a worker thread.
+    """
+    capture_request(request.url.path, data.model_dump())
+    async with admit(request, "continue"):
+        yield
+
+@asynccontextmanager
+async def admit_stream_message(websocket: WebSocket, message: str, session_id: str = None):
+    """
+    Rate limit and queue each message of a WebSocket chat session.
+    """
+    # Captured with its session, so replayed follow-ups keep their context
+    capture_request(websocket.url.path, {"message": message, "session_id": session_id})
+
+    async def route():
+        websocket.state.route = await run_in_threadpool(route_message, message)
+        return websocket.state.route[0]
+
+    async with admit(websocket, route):
+        yield
+
+def remember_answer(session_id: str, user_msg: str, bot_name: str):
+    """
+    Record a microbot or FAQ answer in the session. A follow-up then
+    continues into the section page the message was about, rather than
+    repeating the same answer; answers with no bot clear the context.
+    """
+    if bot_name is None:
+        SESSIONS.update(session_id)
+        return
+    # Only sections already discovered, so a fast reply never waits on a crawl
+    SESSIONS.update(session_id, last_bot=bot_name, section_url=select_relevant_url(user_msg, crawl=False))
+
+def follow_up_reply(session, user_msg: str, started: float):
+    """
+    Answer a follow-up from what the session was last shown, without
+    re-routing. Returns None when there is no usable context.
+    """
+    if session.section_url:
+        page = CONTENT_STORE.get(session.section_url)
+        if page is None:
+            with request_budget(started=started):
+                answer = fetch_page_info(session.section_url)
+            SESSIONS.update(session.session_id, last_bot=session.last_bot, section_url=session.section_url,
+                            text_offset=first_offset(session.section_url))
+            return answer
+        # Carry on from where the previous slice stopped
+        if session.text_offset >= len(page.text):
+            return END_OF_PAGE_REPLY
+        answer, next_offset = page_slice(page, session.text_offset)
+        SESSIONS.update(session.session_id, last_bot=session.last_bot, section_url=page.url,
+                        text_offset=next_offset or len(page.text))
+        return answer
+    return None
+
+def stream_reply(user_msg: str, started: float, session_id: str, route: tuple):
+    """
+    Yield the reply to a message in pieces for the streaming endpoints,
+    given the route it was admitted with.
+    """
+    session = SESSIONS.get(session_id)
+    if session is not None and is_follow_up(user_msg):
+        last_bot = session.last_bot
+        answer = follow_up_reply(session, user_msg, started)
+        if answer is not None:
+            yield answer
+            record_query(user_msg, "follow_up", last_bot, started, transport="stream")
+            return
+
+    tier, answerer = route
+    bot = None
+    if tier == "faq":
+        entry = answerer
+        remember_answer(session_id, user_msg, entry.bot)
+        yield entry.reply
+        record_query(user_msg, tier, entry.bot or entry.intent, started, transport="stream")
+        return
+    elif tier == "microbot":
+        bot = answerer
+        remember_answer(session_id, user_msg, bot.name)
+        yield bot.respond(user_msg)
+    elif tier == "page":
+        with request_budget(started=started):
+            url = select_relevant_url(answerer)
+        yield from iter_page_info(url, started)
+        SESSIONS.update(session_id, section_url=url, text_offset=first_offset(url))
+        record_query(user_msg, tier, None, started, transport="stream", url=url)
+        return
+    else:
+        yield FALLBACK_REPLY
+    record_query(user_msg, tier, bot.name if bot else None, started, transport="stream")
+
+def websocket_reply(websocket: WebSocket):
+    """
+    stream_reply for one WebSocket session: each message is answered from the
+    route it was admitted with and tagged with its tier.
+    """
+    def reply(user_msg: str, started: float, session_id: str = None):
+        return tag_iter(websocket.state.tier, stream_reply(user_msg, started, session_id, websocket.state.route))
+    return reply
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    """Readiness: warm-up has finished or timed out"""
+    status = WARMUP.status()
+    return JSONResponse(status, status_code=200 if WARMUP.ready() else 503)
+
+@app.get("/metrics")
+def metrics():
+    """Expose process metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.post("/chat", dependencies=[Depends(admit_chat)])
+@tagged_by_tier
+def chat(data: Message, request: Request):
     user_msg = data.message.strip()
     
-    # Handle common greetings
-    greetings = ["hi", "hello", "hlo", "hey", "good morning", "good afternoon", "good evening"]
-    if user_msg.lower() in greetings:
-        return {"reply": "Hi, I'm chatbot assistant. How can I help you today?"}
+    # Answer bare follow-ups ("tell me more") from the session's context
+    session = SESSIONS.get(data.session_id)
+    if session is not None and is_follow_up(user_msg):
+        last_bot = session.last_bot
+        answer = follow_up_reply(session, user_msg, request.state.received_at)
+        if answer is not None:
+            record_query(user_msg, "follow_up", last_bot, request.state.received_at)
+            return reply_response(request, {"reply": answer}, deterministic=False)
+    
+    tier, answerer = request.state.route
+
+    # Answer greetings, thanks, goodbyes and common questions from the FAQ table
+    if tier == "faq":
+        entry = answerer
+        remember_answer(data.session_id, user_msg, entry.bot)
+        record_query(user_msg, "faq", entry.bot or entry.intent, request.state.received_at)
+        return reply_response(request, {"reply": entry.reply})
     
     # First check if a microbot can handle this query
-    microbot_response = get_microbot_response(user_msg)
-    if microbot_response:
-        return {"reply": microbot_response}
+    if tier == "microbot":
+        bot = answerer
+        remember_answer(data.session_id, user_msg, bot.name)
+        answer = bot.respond(user_msg)
+        record_query(user_msg, "microbot", bot.name, request.state.received_at)
+        return reply_response(request, {"reply": answer})
     
     # Otherwise check if it's company related and fetch information
-    if is_company_related(user_msg):
-        # Fetch company information from the most relevant URL
-        answer = fetch_company_info(user_msg)
-        return {"reply": answer}
+    if tier == "page":
+        # Fetch company information from the most relevant URL within the latency budget
+        with request_budget(started=request.state.received_at):
+            url = select_relevant_url(answerer)
+            answer = fetch_page_info(url)
+        SESSIONS.update(data.session_id, section_url=url, text_offset=first_offset(url))
+        payload = {"reply": answer}
+        # Long answers carry a cursor to the rest of the page text
+        cursor = next_cursor(url)
+        if cursor:
+            payload["cursor"] = cursor
+        record_query(user_msg, "page", None, request.state.received_at, url=url)
+        # Page content can change between refreshes, so clients must revalidate
+        return reply_response(request, payload, deterministic=False)
 
     # Otherwise give default message
-    return {"reply": "Please contact admin for more details."}
\ No newline at end of file
+    record_query(user_msg, "fallback", None, request.state.received_at)
+    return reply_response(request, {"reply": FALLBACK_REPLY})
+
+@app.post("/chat/continue", dependencies=[Depends(admit_continue)])
+@tagged_by_tier
+def chat_continue(data: ContinueRequest, request: Request):
+    """Return the next slice of a long page answer from its cursor"""
+    resolved = CONTENT_STORE.resolve(data.cursor)
+    if resolved is None:
+        # The page has been refreshed since, so the cursor no longer points anywhere
+        raise HTTPException(status_code=404, detail="This answer has expired. Please ask again.")
+    page, offset = resolved
+    if offset >= len(page.text):
+        # Cursors are only issued while text remains, so there is no slice to serve or cache
+        raise HTTPException(status_code=404, detail=END_OF_PAGE_REPLY)
+    answer, next_offset = page_slice(page, offset)
+    SESSIONS.update(data.session_id, section_url=page.url, text_offset=next_offset or len(page.text))
+    payload = {"reply": answer}
+    if next_offset is not None:
+        payload["cursor"] = make_cursor(page, next_offset)
+    # A cursor names one version of the page text, so its slice never changes
+    return reply_response(request, payload)
+
+@app.post("/chat/stream", dependencies=[Depends(admit_chat)])
+def chat_stream(data: Message, request: Request):
+    """Stream the reply to a chat message as Server-Sent Events"""
+    pieces = stream_reply(data.message.strip(), request.state.received_at, data.session_id, request.state.route)
+    return sse_response(tag_iter(request.state.tier, pieces), request.state.received_at)
+
+@app.websocket("/chat/ws")
+async def chat_ws(websocket: WebSocket):
+    """Stream replies over one WebSocket per chat session"""
+    await serve_websocket(websocket, websocket_reply(websocket), admit_stream_message)
\ No newline at end of file
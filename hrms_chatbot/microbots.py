@@ -510,6 +510,9 @@ MICROBOTS = [
     SelfServiceBot()
 ]
 
+# Microbots by name, for answering follow-ups from session context
+MICROBOTS_BY_NAME = {bot.name: bot for bot in MICROBOTS}
+
 
 def get_relevant_microbot(message: str) -> Microbot:
     """
@@ -0,0 +1,159 @@
+"""
+Parse pool module for the chatbot system.
+This module takes HTML parsing off the threads that serve requests.
+BeautifulSoup's html.parser is pure Python, so a large page parsed in a
+worker thread holds the GIL for tens of milliseconds at a time and slows
+every other route in the process. Pages of PARSE_OFFLOAD_MIN_BYTES or more
+are sent as raw UTF-8 bytes to a bounded pool of PARSE_WORKERS processes,
+which send back only the extracted text or links, never parse trees.
+Smaller pages are parsed in the calling thread, where the round trip would
+cost more than the parse itself.
+
+At most PARSE_MAX_PENDING pages are handed to the pool at once; further
+callers wait for a slot, and the wait releases the GIL. If a worker process
+dies, the pool is rebuilt and that page is parsed in-thread.
+PARSE_WORKERS=0 parses everything in-thread.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import html_text
+from metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Parse worker processes; 0 keeps all parsing in the request threads
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Pages smaller than this (in characters) are parsed in the calling thread
+PARSE_OFFLOAD_MIN_BYTES = int(os.getenv("PARSE_OFFLOAD_MIN_BYTES", "16384"))
+
+# Pages queued for or being parsed by the pool at once
+PARSE_MAX_PENDING = int(os.getenv("PARSE_MAX_PENDING", str(max(PARSE_WORKERS, 1) * 2)))
+
+PARSE_JOBS = Counter("chatbot_parse_jobs_total", "Pages parsed, by where (process, thread or fallback)", ("where",))
+PARSE_POOL_PENDING = Gauge("chatbot_parse_pool_pending", "Pages queued for or being parsed by the parse pool")
+
+# Returned by _submit when the page has to be parsed in-thread after all
+_UNAVAILABLE = object()
+
+
+class ParsePool:
+    """
+    Bounded process pool for HTML parsing with an in-thread path for small
+    pages. Worker processes are started with "spawn", so they never inherit
+    the server's threads or locks, and only import html_text.
+    """
+    def __init__(self, workers: int = PARSE_WORKERS, min_bytes: int = PARSE_OFFLOAD_MIN_BYTES,
+                 max_pending: int = PARSE_MAX_PENDING):
+        self.workers = workers
+        self.min_bytes = min_bytes
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def offloads(self, html: str) -> bool:
+        """
+        True when a page of this size is parsed in the pool.
+        """
+        return self.workers > 0 and len(html) >= self.min_bytes
+
+    def _get_executor(self):
+        """
+        The running pool, started on first use, or None once shut down.
+        """
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=html_text.warm_worker,
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """
+        Start the worker processes ahead of the first large page.
+        """
+        executor = self._get_executor()
+        if executor is not None:
+            for _ in range(self.workers):
+                executor.submit(html_text.warm_worker)
+
+    def shutdown(self):
+        """
+        Stop the worker processes; later pages are parsed in-thread.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self.workers = 0
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _call(self, worker_function, local_function, html: str, *args):
+        if not self.offloads(html):
+            PARSE_JOBS.inc(where="thread")
+            return local_function(html, *args)
+        body = html.encode("utf-8")
+        with self._slots:
+            PARSE_POOL_PENDING.inc()
+            try:
+                result = self._submit(worker_function, body, *args)
+            finally:
+                PARSE_POOL_PENDING.dec()
+        if result is _UNAVAILABLE:
+            PARSE_JOBS.inc(where="fallback")
+            return local_function(html, *args)
+        PARSE_JOBS.inc(where="process")
+        return result
+
+    def _submit(self, worker_function, body: bytes, *args):
+        """
+        Run one job in the pool and return its result, or _UNAVAILABLE if the
+        pool is shut down or a worker died. Errors raised by the job itself
+        (a page too deeply nested to parse, say) propagate as they would
+        in-thread.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return _UNAVAILABLE
+        try:
+            future = executor.submit(worker_function, body, *args)
+        except BrokenProcessPool:
+            return self._broken(executor)
+        except RuntimeError:
+            # Shut down by another caller since we got it
+            self._discard(executor)
+            return _UNAVAILABLE
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            return self._broken(executor)
+
+    def _broken(self, executor: ProcessPoolExecutor):
+        logger.error("A parse worker died; restarting the pool and parsing this page in-thread")
+        self._discard(executor)
+        return _UNAVAILABLE
+
+    def extract(self, html: str, with_summary: bool = True) -> tuple:
+        """
+        html_text.extract() in the pool for large pages, in-thread for small ones.
+        """
+        return self._call(html_text.extract_body, html_text.extract, html, with_summary)
+
+    def links(self, html: str) -> list:
+        """
+        html_text.page_links() in the pool for large pages, in-thread for small ones.
+        """
+        return self._call(html_text.page_links_body, html_text.page_links, html)
+
+
+PARSE_POOL = ParsePool()
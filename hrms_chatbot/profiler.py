@@ -0,0 +1,274 @@
+"""
+Profiler module for the chatbot system.
+This module is a sampling CPU profiler that an operator starts through the
+admin endpoints. A background thread reads the stack of every thread in the
+process (the Starlette threadpool, the event loop, the scheduler's refresh
+workers) at PROFILE_HZ for a bounded number of seconds. Threads parked on a
+lock, a queue or a selector are skipped, so the profile shows where CPU goes.
+
+Each sample is tagged with the route tier the thread is serving (set by
+tagged_by_tier and tag_iter around request handlers) or, for background threads, by
+the thread's role. Results are written as collapsed stacks ("frame;frame;
+frame count" per line), which flamegraph.pl, inferno and speedscope render
+directly: one file per tier plus one with the tier as the root frame.
+"""
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Default and highest sampling rates, in samples per second
+PROFILE_HZ = float(os.getenv("PROFILE_HZ", "100"))
+PROFILE_MAX_HZ = 1000.0
+
+# A profile never runs longer than this, whatever the caller asks for
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# Where collapsed-stack files are written
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Deeper stacks are cut off at the root end
+PROFILE_MAX_DEPTH = 128
+
+# Innermost frames of a thread that is waiting rather than running
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+
+# Route tier each thread is serving right now, by thread ident
+_THREAD_TIERS = {}
+
+
+@contextmanager
+def tier_tag(tier: str):
+    """
+    Tag the current thread with a route tier while the block runs.
+    """
+    ident = threading.get_ident()
+    previous = _THREAD_TIERS.get(ident)
+    _THREAD_TIERS[ident] = tier
+    try:
+        yield
+    finally:
+        if previous is None:
+            _THREAD_TIERS.pop(ident, None)
+        else:
+            _THREAD_TIERS[ident] = previous
+
+
+def tag_iter(tier: str, pieces):
+    """
+    Tag whichever thread advances a reply iterator. Streamed replies resume on
+    a different threadpool thread for each piece, so tagging the thread that
+    created the iterator is not enough.
+    """
+    pieces = iter(pieces)
+    while True:
+        with tier_tag(tier):
+            try:
+                piece = next(pieces)
+            except StopIteration:
+                return
+        yield piece
+
+
+def tagged_by_tier(handler):
+    """
+    Wrap a sync endpoint so its thread is tagged with the tier the request
+    was admitted for (request.state.tier, set by admission).
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with tier_tag(kwargs["request"].state.tier):
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+def _thread_role(name: str) -> str:
+    """
+    Tag for samples from a thread that is not serving a request.
+    """
+    if name == "MainThread":
+        return "event_loop"
+    if name.startswith(("refresh", "scheduler")):
+        return "refresh"
+    if name.startswith("AnyIO worker"):
+        # Threadpool work outside a tagged handler: dependencies, response iteration
+        return "threadpool"
+    if name.startswith(("warmup", "analytics")):
+        return name.split("-")[0]
+    return "other"
+
+
+class SamplingProfiler:
+    """
+    Time-boxed sampler of all thread stacks. One profile runs at a time; the
+    counts of the last run stay available until the next one starts.
+    """
+    def __init__(self, directory: str = PROFILE_DIR):
+        self.directory = directory
+        self.counts = Counter()
+        self.files = []
+        self.started = None
+        self.duration = None
+        self.hz = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, hz: float = PROFILE_HZ) -> bool:
+        """
+        Start sampling for `seconds` at `hz`. Returns False if a profile is
+        already running.
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self.hz = min(max(hz, 1.0), PROFILE_MAX_HZ)
+            self.duration = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+            self.counts = Counter()
+            self.files = []
+            self.samples = 0
+            self.sampling_seconds = 0.0
+            self.started = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """
+        End the running profile early and wait for its files to be written.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self, names: dict):
+        """
+        Record one stack per busy thread. names maps thread ident to name.
+        """
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+            codes = []
+            while frame is not None and len(codes) < PROFILE_MAX_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            tier = _THREAD_TIERS.get(ident) or _thread_role(names.get(ident, ""))
+            self.counts[(tier, tuple(codes))] += 1
+
+    def _run(self):
+        interval = 1.0 / self.hz
+        deadline = time.monotonic() + self.duration
+        names = {}
+        names_at = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            # Thread names only change when threads start, so refresh them once a second
+            if now - names_at >= 1.0:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                names_at = now
+            self.sample(names)
+            took = time.monotonic() - now
+            self.samples += 1
+            self.sampling_seconds += took
+            self._stop.wait(max(0.0, interval - took))
+        self.duration = time.time() - self.started
+        try:
+            self.files = self.write()
+        except OSError as e:
+            logger.error(f"Could not write profile: {str(e)}")
+        logger.info(f"Profile finished: {self.samples} samples over {self.duration:.1f}s")
+
+    def collapsed(self, tier: str = None, with_tier: bool = False) -> str:
+        """
+        Render the counts as collapsed stacks, root frame first.
+        """
+        merged = Counter()
+        for (sample_tier, codes), count in list(self.counts.items()):
+            if tier is not None and sample_tier != tier:
+                continue
+            frames = [self._label(code) for code in reversed(codes)]
+            if with_tier:
+                frames.insert(0, sample_tier)
+            merged[";".join(frames)] += count
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+    def tiers(self) -> dict:
+        """
+        Sample counts per tier.
+        """
+        totals = Counter()
+        for (tier, _), count in list(self.counts.items()):
+            totals[tier] += count
+        return dict(totals.most_common())
+
+    def write(self) -> list:
+        """
+        Write one collapsed-stack file per tier and one for all tiers.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(self.started))
+        outputs = [("all", self.collapsed(with_tier=True))]
+        outputs += [(tier, self.collapsed(tier)) for tier in self.tiers()]
+        paths = []
+        for tier, text in outputs:
+            path = os.path.join(self.directory, f"cpu-{stamp}-{os.getpid()}-{tier}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            paths.append(path)
+        return paths
+
+    def status(self) -> dict:
+        if self.running:
+            elapsed = time.time() - self.started
+        else:
+            elapsed = self.duration or 0.0
+        return {
+            "running": self.running,
+            "hz": self.hz,
+            "seconds": round(self.duration, 1) if self.duration else None,
+            "elapsed_seconds": round(elapsed, 1) if self.running else None,
+            "samples": self.samples,
+            # Share of one core spent taking samples
+            "overhead": round(self.sampling_seconds / max(elapsed, 1e-9), 4) if self.samples else 0.0,
+            "tiers": self.tiers(),
+            "files": self.files,
+        }
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,154 @@
+"""
+Session module for the chatbot system.
+This module keeps a small, memory-bounded record of each chat session (the
+last bot that answered, the page section and how far into it the user has
+read) so follow-up questions can be answered from context.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Hard limits on the store; whichever is hit first evicts the least recently used session
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "100000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Sessions idle for longer than this are dropped
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+
+# Longest session ID accepted from clients
+MAX_SESSION_ID_LENGTH = 128
+
+# Approximate per-entry cost of the OrderedDict slot and linked-list node plus
+# the boxed text offset and timestamp (measured with tools/bench_sessions.py)
+_ENTRY_OVERHEAD = 144
+
+# Messages that only make sense as a continuation of the previous answer
+FOLLOW_UP_PHRASES = {
+    "more",
+    "more please",
+    "tell me more",
+    "tell me more about that",
+    "tell me more about it",
+    "more about that",
+    "more info",
+    "more information",
+    "more details",
+    "details",
+    "go on",
+    "continue",
+    "keep going",
+    "what else",
+    "anything else",
+    "and",
+    "elaborate",
+    "explain more",
+}
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+class Session:
+    """
+    Compact per-session record.
+    """
+    __slots__ = ("session_id", "last_bot", "section_url", "text_offset", "last_seen")
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        self.last_bot = None
+        self.section_url = None
+        self.text_offset = 0
+        self.last_seen = now
+
+
+def is_follow_up(message: str) -> bool:
+    """
+    Check whether a message is a bare follow-up such as "tell me more".
+    """
+    normalized = " ".join(_NON_WORD.sub(" ", message.lower()).split())
+    return normalized in FOLLOW_UP_PHRASES
+
+
+class SessionStore:
+    """
+    LRU session store with idle-TTL expiry and count and memory caps.
+    """
+    def __init__(self, max_count: int = SESSION_MAX_COUNT, max_bytes: int = SESSION_MAX_BYTES,
+                 idle_ttl: float = SESSION_IDLE_TTL, clock=time.monotonic):
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self.bytes_used = 0
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _record_size(session: Session) -> int:
+        # Bot names and section URLs are shared constants, so only the ID is per-session
+        return sys.getsizeof(session) + sys.getsizeof(session.session_id) + _ENTRY_OVERHEAD
+
+    def _drop(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self.bytes_used -= self._record_size(session)
+        self.evictions += 1
+
+    def _evict(self, now: float):
+        """
+        Drop expired sessions and enforce the caps. Caller holds the lock.
+        """
+        # Sessions are kept in last-seen order, so expired ones are at the front
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_seen <= self.idle_ttl and len(self._sessions) <= self.max_count \
+                    and self.bytes_used <= self.max_bytes:
+                break
+            self._drop(oldest_id)
+
+    def get(self, session_id: str):
+        """
+        Return the live session for an ID, or None.
+        """
+        if not session_id:
+            return None
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_seen > self.idle_ttl:
+                self._drop(session_id)
+                return None
+            return session
+
+    def update(self, session_id: str, last_bot: str = None, section_url: str = None, text_offset: int = 0):
+        """
+        Record what was last shown to a session, creating it if needed.
+        """
+        if not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+            return
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, now)
+                self._sessions[session_id] = session
+                self.bytes_used += self._record_size(session)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_bot = last_bot
+            session.section_url = section_url
+            session.text_offset = text_offset
+            session.last_seen = now
+            self._evict(now)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+SESSIONS = SessionStore()
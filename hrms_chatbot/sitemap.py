@@ -0,0 +1,190 @@
+"""
+Sitemap module for the chatbot system.
+This module reads a site's sitemap.xml, following sitemap indexes, with a
+streaming parser that drops each entry once it has been read, so memory
+stays flat however many URLs a sitemap lists. It keeps the <lastmod> of the
+pages the bot serves, so the refresh pipeline can refetch only the pages
+that changed since they were last fetched. Child sitemaps whose own
+<lastmod> has not moved are not downloaded again.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Entries read from one sitemap file at most (the sitemap protocol's own limit)
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "50000"))
+
+# Levels of sitemap indexes followed below the top-level sitemap
+SITEMAP_MAX_DEPTH = 2
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+SITEMAP_READS = Counter("chatbot_sitemap_reads_total", "Sitemap files read, by outcome (read, reused or error)", ("outcome",))
+
+
+def parse_lastmod(value: str):
+    """
+    Parse a W3C datetime (2024, 2024-05, 2024-05-01 or a full ISO timestamp)
+    into epoch seconds. Returns None when the value is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    # fromisoformat needs a full date
+    if len(value) == 4:
+        value += "-01-01"
+    elif len(value) == 7:
+        value += "-01"
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _sitemap_tag(tag: str):
+    """
+    Local name of a sitemap-protocol element, or None for elements of other
+    namespaces (image:loc, news:publication_date, ...).
+    """
+    if tag.startswith("{"):
+        namespace, _, name = tag[1:].partition("}")
+        return name if namespace == SITEMAP_NAMESPACE else None
+    return tag
+
+
+def iter_sitemap(stream):
+    """
+    Yield (kind, loc, lastmod) for each <url> or <sitemap> entry of a sitemap
+    read from a binary stream. kind is "url" or "sitemap"; lastmod is epoch
+    seconds or None.
+    """
+    root = None
+    loc = lastmod = None
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        tag = _sitemap_tag(element.tag)
+        if tag == "loc":
+            loc = (element.text or "").strip()
+        elif tag == "lastmod":
+            lastmod = parse_lastmod(element.text)
+        elif tag in ("url", "sitemap"):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            # Drop finished entries so memory does not grow with the sitemap
+            root.clear()
+
+
+class SitemapIndex:
+    """
+    Section pages and <lastmod> times learned from a site's sitemaps.
+
+    open_sitemap(url) is a context manager yielding the sitemap as a binary
+    stream, raising if there is none; classify(url) returns the site section
+    a page belongs to or None. Only pages in a section, or listed in track,
+    are remembered.
+    """
+    def __init__(self, open_sitemap, classify, track=(), max_urls: int = SITEMAP_MAX_URLS,
+                 max_depth: int = SITEMAP_MAX_DEPTH):
+        self.open_sitemap = open_sitemap
+        self.classify = classify
+        self.track = set(track)
+        self.max_urls = max_urls
+        self.max_depth = max_depth
+        self.available = False
+        self.lastmod = {}
+        self.fetched = {}
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _entries(self, url: str, depth: int, children: dict) -> list:
+        """
+        Read one sitemap file, following child sitemaps, and return
+        (loc, lastmod, section) for each page of interest.
+        """
+        entries = []
+        with self.open_sitemap(url) as stream:
+            for count, (kind, loc, lastmod) in enumerate(iter_sitemap(stream)):
+                if count >= self.max_urls:
+                    logger.warning(f"Sitemap {url} lists more than {self.max_urls} entries; ignoring the rest")
+                    break
+                if kind == "url":
+                    section = self.classify(loc)
+                    if section is not None or loc in self.track:
+                        entries.append((loc, lastmod, section))
+                    continue
+                if depth >= self.max_depth:
+                    continue
+                previous = self._children.get(loc)
+                if previous is not None and lastmod is not None and previous[0] == lastmod:
+                    SITEMAP_READS.inc(outcome="reused")
+                    child_entries = previous[1]
+                else:
+                    try:
+                        child_entries = self._entries(loc, depth + 1, children)
+                    except Exception as e:
+                        logger.warning(f"Could not read sitemap {loc}: {str(e)}")
+                        SITEMAP_READS.inc(outcome="error")
+                        if previous is None:
+                            continue
+                        child_entries = previous[1]
+                children[loc] = (lastmod, child_entries)
+                entries.extend(child_entries)
+        SITEMAP_READS.inc(outcome="read")
+        return entries
+
+    def read(self, url: str):
+        """
+        Read the sitemap at url and return {section: page URL}, picking the
+        shortest URL per section (its landing page rather than a sub-page).
+        Returns None when there is no usable sitemap.
+        """
+        with self._lock:
+            children = {}
+            try:
+                entries = self._entries(url, 0, children)
+            except Exception as e:
+                logger.info(f"No usable sitemap at {url}: {str(e)}")
+                SITEMAP_READS.inc(outcome="error")
+                self.available = False
+                return None
+            sections = {}
+            lastmods = {}
+            for loc, lastmod, section in entries:
+                if lastmod is not None:
+                    lastmods[loc] = lastmod
+                if section is not None and (section not in sections or len(loc) < len(sections[section])):
+                    sections[section] = loc
+            self.lastmod = lastmods
+            self._children = children
+            self.available = True
+            return sections
+
+    def is_current(self, url: str) -> bool:
+        """
+        True when the sitemap gives url a lastmod no newer than the one it had
+        when the page was last fetched.
+        """
+        lastmod = self.lastmod.get(url)
+        fetched = self.fetched.get(url)
+        return lastmod is not None and fetched is not None and fetched >= lastmod
+
+    def mark_fetched(self, url: str):
+        """
+        Record that url was just fetched at its current sitemap lastmod.
+        """
+        lastmod = self.lastmod.get(url)
+        if lastmod is not None:
+            self.fetched[url] = lastmod
@@ -0,0 +1,119 @@
+"""
+Streaming module for the chatbot system.
+This module sends chat replies incrementally, either as Server-Sent Events
+over one POST per message or over one WebSocket per chat session.
+"""
+
+import json
+import time
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from metrics import Gauge, Histogram
+
+STREAM_CONNECTIONS = Gauge(
+    "chatbot_stream_connections",
+    "Open streaming chat connections",
+    ("transport",),
+)
+STREAM_FIRST_PIECE = Histogram(
+    "chatbot_stream_first_piece_seconds",
+    "Time from receiving a streamed message to sending the first reply text",
+    ("transport",),
+)
+STREAM_MESSAGE_LATENCY = Histogram(
+    "chatbot_stream_message_seconds",
+    "Time from receiving a streamed message to sending the end of its reply",
+    ("transport",),
+)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Format one Server-Sent Event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_stream(pieces, started: float):
+    """
+    Wrap reply pieces in start/delta/end events, recording latencies.
+    """
+    STREAM_CONNECTIONS.inc(transport="sse")
+    try:
+        # Acknowledge straight away so the widget can show a typing indicator
+        yield sse_event("start", {})
+        first = True
+        for piece in pieces:
+            if first:
+                STREAM_FIRST_PIECE.observe(time.monotonic() - started, transport="sse")
+                first = False
+            yield sse_event("delta", {"text": piece})
+        elapsed = time.monotonic() - started
+        STREAM_MESSAGE_LATENCY.observe(elapsed, transport="sse")
+        yield sse_event("end", {"latency_ms": round(elapsed * 1000, 1)})
+    finally:
+        STREAM_CONNECTIONS.dec(transport="sse")
+
+
+def sse_response(pieces, started: float) -> StreamingResponse:
+    """
+    Build a text/event-stream response from an iterator of reply pieces.
+    """
+    return StreamingResponse(
+        _sse_stream(pieces, started),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def serve_websocket(websocket: WebSocket, reply_stream, admit_message):
+    """
+    Serve one chat session over a WebSocket.
+
+    Each client frame is {"message": "...", "session_id": "..."}; each reply
+    is sent as a "start" frame, one or more "delta" frames and an "end" frame.
+    A frame that is not JSON text is answered with an "error" frame.
+    reply_stream(message, started, session_id) yields reply pieces (it may
+    block, so it runs in the threadpool), and admit_message(websocket,
+    message, session_id) is the admission context per message.
+    """
+    await websocket.accept()
+    STREAM_CONNECTIONS.inc(transport="websocket")
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Not JSON (ValueError) or a binary frame (KeyError); the session carries on
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Frames must be JSON text."})
+                continue
+            if not isinstance(data, dict):
+                data = {}
+            message = str(data.get("message", "")).strip()
+            session_id = data.get("session_id")
+            if not isinstance(session_id, str):
+                session_id = None
+            started = time.monotonic()
+            try:
+                async with admit_message(websocket, message, session_id):
+                    await websocket.send_json({"type": "start"})
+                    pieces = iter(reply_stream(message, started, session_id))
+                    first = True
+                    while True:
+                        piece = await run_in_threadpool(next, pieces, None)
+                        if piece is None:
+                            break
+                        if first:
+                            STREAM_FIRST_PIECE.observe(time.monotonic() - started, transport="websocket")
+                            first = False
+                        await websocket.send_json({"type": "delta", "text": piece})
+                    elapsed = time.monotonic() - started
+                    STREAM_MESSAGE_LATENCY.observe(elapsed, transport="websocket")
+                    await websocket.send_json({"type": "end", "latency_ms": round(elapsed * 1000, 1)})
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        STREAM_CONNECTIONS.dec(transport="websocket")
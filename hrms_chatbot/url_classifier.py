@@ -0,0 +1,139 @@
+"""
+URL classifier module for the chatbot system.
+This module maps the links found on a site's main page to site sections
+(about, contact, blog, ...). Sections are declared as data, as
+(section, path keywords) rules in priority order: a link belongs to the
+first section with a keyword anywhere in its lowercased path.
+
+A batch of links is joined and lowercased once and narrowed with plain
+string searches to the few links that contain any keyword. Only those are
+classified one by one, against a single compiled regex of all keywords and
+then the rules in order. The base URL is parsed once, and root-relative and
+absolute same-site links are recognised by a compiled pattern instead of a
+urljoin/urlparse round trip.
+"""
+
+import bisect
+import itertools
+import re
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+
+def compile_rules(rules) -> re.Pattern:
+    """
+    Compile (section, keywords) rules into one pattern matching any keyword.
+    Alternatives sharing a first letter are grouped so the regex engine can
+    skip most positions of a path with a single character-set test.
+    """
+    by_first = {}
+    for _, keywords in rules:
+        for keyword in keywords:
+            keyword = keyword.lower()
+            by_first.setdefault(keyword[0], set()).add(keyword)
+    groups = []
+    for first, keywords in sorted(by_first.items()):
+        tails = sorted((re.escape(keyword[1:]) for keyword in keywords), key=len, reverse=True)
+        groups.append(f"{re.escape(first)}(?:{'|'.join(tails)})")
+    return re.compile("|".join(groups))
+
+
+class SectionClassifier:
+    """
+    Classifies links against one base URL with compiled section rules.
+    """
+    def __init__(self, base_url: str, rules):
+        self.base_url = base_url
+        self.netloc = urlsplit(base_url).netloc
+        self.rules = tuple((section, tuple(keyword.lower() for keyword in keywords)) for section, keywords in rules)
+        self._keywords = compile_rules(self.rules)
+        # Path of a root-relative link, or of an absolute link to this host
+        self._same_site = re.compile(
+            rf"(?:https?://{re.escape(self.netloc)}(/(?!/)[^?#]*|(?=[?#]|$))|(/(?!/)[^?#]*))"
+        )
+        # A link that names no keyword anywhere can still resolve into a section
+        # only if the base URL's own path names one
+        base_path = urlsplit(base_url).path.lower()
+        self._keyword_free_links_match = any(keyword in base_path for _, keywords in self.rules for keyword in keywords)
+
+    def _same_site_path(self, href: str):
+        """
+        Return the path of href if it points at the base URL's host, else None.
+        """
+        match = self._same_site.match(href)
+        if match is not None:
+            path = match.group(1)
+            if path is None:
+                path = match.group(2)
+            if "/." not in path:
+                return path
+        # Relative, protocol-relative and dot-segment links need full resolution
+        parts = urlsplit(urljoin(self.base_url, href))
+        return parts.path if parts.netloc == self.netloc else None
+
+    def _section_of_path(self, path: str):
+        """
+        Return the first section with a keyword in path, or None.
+        """
+        path = path.lower()
+        # Most links name no section; only those that do go through the rules in order
+        if self._keywords.search(path) is None:
+            return None
+        for section, keywords in self.rules:
+            for keyword in keywords:
+                if keyword in path:
+                    return section
+        return None
+
+    def classify(self, href: str):
+        """
+        Return the section a link belongs to, or None.
+        """
+        path = self._same_site_path(href)
+        return None if path is None else self._section_of_path(path)
+
+    def _candidates(self, hrefs: list):
+        """
+        Indexes, in order, of the links that contain some keyword. The links
+        are joined and lowercased once and each keyword found with str.find,
+        so links naming no section never reach Python-level code.
+        """
+        if self._keyword_free_links_match:
+            return range(len(hrefs))
+        text = "\n".join(hrefs)
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Some characters lowercase to several, so offsets would not line up
+            return range(len(hrefs))
+        starts = [0]
+        starts.extend(itertools.accumulate(len(href) + 1 for href in hrefs))
+        indexes = set()
+        for _, keywords in self.rules:
+            for keyword in keywords:
+                position = lowered.find(keyword)
+                while position != -1:
+                    index = bisect.bisect_right(starts, position) - 1
+                    indexes.add(index)
+                    # Skip to the next link; one hit is enough to make it a candidate
+                    position = lowered.find(keyword, starts[index + 1] if index + 1 < len(starts) else len(lowered))
+        return sorted(indexes)
+
+    def classify_links(self, hrefs) -> dict:
+        """
+        Map each section to the absolute URL of the last link classified into it.
+        """
+        hrefs = list(hrefs)
+        found = {}
+        for index in self._candidates(hrefs):
+            section = self.classify(hrefs[index])
+            if section is not None:
+                found[section] = hrefs[index]
+        return {section: urljoin(self.base_url, href) for section, href in found.items()}
+
+
+@lru_cache(maxsize=8)
+def section_classifier(base_url: str, rules: tuple) -> SectionClassifier:
+    """
+    Shared classifier for a base URL and rule set, built on first use.
+    """
+    return SectionClassifier(base_url, rules)
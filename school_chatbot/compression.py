@@ -0,0 +1,170 @@
+"""
+Compression module for the chatbot system.
+This module negotiates gzip/brotli encoding for chat replies and attaches
+HTTP caching validators (ETag, Cache-Control) to the responses.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = int(os.getenv("MIN_COMPRESS_SIZE", "512"))
+
+# Maximum number of pre-compressed variants kept for constant replies
+VARIANT_CACHE_SIZE = int(os.getenv("VARIANT_CACHE_SIZE", "512"))
+
+# Freshness lifetime for deterministic replies (greetings, microbots, buttons)
+DETERMINISTIC_MAX_AGE = int(os.getenv("DETERMINISTIC_MAX_AGE", "3600"))
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+# Pre-compressed variants keyed by (etag, encoding)
+VARIANT_CACHE = OrderedDict()
+_variant_lock = threading.Lock()
+
+
+def supported_encodings() -> list:
+    """
+    Return the content codings this server can produce, best first.
+    """
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Pick the best content coding allowed by an Accept-Encoding header.
+    Returns "identity" when no supported coding is acceptable.
+    """
+    if not accept_encoding:
+        return "identity"
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        pieces = part.strip().split(";")
+        coding = pieces[0].strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in pieces[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = "identity", 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """
+    Encode a response body with the given content coding.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-identical across calls
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def _cached_variant(etag: str, encoding: str, body: bytes) -> bytes:
+    """
+    Return a pre-compressed variant of a constant body, compressing it once.
+    """
+    key = (etag, encoding)
+    with _variant_lock:
+        encoded = VARIANT_CACHE.get(key)
+        if encoded is not None:
+            VARIANT_CACHE.move_to_end(key)
+            return encoded
+
+    encoded = compress_body(body, encoding)
+
+    with _variant_lock:
+        VARIANT_CACHE[key] = encoded
+        while len(VARIANT_CACHE) > VARIANT_CACHE_SIZE:
+            VARIANT_CACHE.popitem(last=False)
+    return encoded
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Build a strong ETag from the uncompressed body.
+    """
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against our ETag, ignoring coding suffixes.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            continue
+        if candidate.strip('"').split("-")[0] == tag:
+            return True
+    return False
+
+
+def reply_response(request: Request, payload: dict, deterministic: bool = True) -> Response:
+    """
+    Build a JSON response for a chat reply.
+
+    Deterministic replies are cacheable and served from pre-compressed
+    variants; page-derived replies are compressed per request and must be
+    revalidated before reuse.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = make_etag(body)
+
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={DETERMINISTIC_MAX_AGE}" if deterministic else "no-cache",
+    }
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if len(body) < MIN_COMPRESS_SIZE:
+        encoding = "identity"
+
+    # Each content coding is a distinct representation, so it gets its own tag
+    headers["ETag"] = etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        if deterministic:
+            body = _cached_variant(etag, encoding, body)
+        else:
+            body = compress_body(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
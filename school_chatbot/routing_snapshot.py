@@ -0,0 +1,69 @@
+"""
+Routing snapshot module for the chatbot system.
+This module caches the routing indexes derived at startup (the FAQ table and
+the typo deletion index) in pickle files, so a cold start loads them instead
+of rebuilding them. A snapshot is only used while the sources it was built
+from are unchanged.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+
+logger = logging.getLogger(__name__)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Snapshots can be turned off, e.g. on a read-only filesystem
+ROUTING_SNAPSHOT_ENABLED = os.getenv("ROUTING_SNAPSHOT_ENABLED", "true").lower() == "true"
+ROUTING_SNAPSHOT_DIR = os.getenv("ROUTING_SNAPSHOT_DIR", os.path.join(_HERE, ".routing_snapshot"))
+
+# Source files every routing index is derived from
+_SOURCES = ("microbots.py", "company_logic.py", "faq.py", "spelling.py")
+
+
+def fingerprint(*extra) -> str:
+    """
+    Hash the routing sources plus any extra inputs (data files, settings).
+    """
+    digest = hashlib.sha1()
+    for name in _SOURCES:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            digest.update(f.read())
+    for item in extra:
+        if isinstance(item, str) and os.path.isfile(item):
+            with open(item, "rb") as f:
+                digest.update(f.read())
+        else:
+            digest.update(repr(item).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_or_build(name: str, build, *inputs):
+    """
+    Return the snapshot `name` if it was built from the current sources and
+    inputs, otherwise call build() and save its result for the next start.
+    """
+    if not ROUTING_SNAPSHOT_ENABLED:
+        return build()
+    key = fingerprint(*inputs)
+    path = os.path.join(ROUTING_SNAPSHOT_DIR, f"{name}.pickle")
+    try:
+        with open(path, "rb") as f:
+            saved_key, value = pickle.load(f)
+        if saved_key == key:
+            return value
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        pass
+    value = build()
+    try:
+        os.makedirs(ROUTING_SNAPSHOT_DIR, exist_ok=True)
+        # Write then rename, so concurrently starting workers never read a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not save routing snapshot {name}: {str(e)}")
+    return value
@@ -1,79 +1,214 @@
 """
 Scheduler module for school chatbot.
 This module handles scheduled updates of information from URLs.
+
+Each page is refreshed on its own interval, which shrinks when the page is
+seen to change and grows while it stays the same, so busy pages stay fresh
+and static ones cost almost nothing. Refresh times are jittered so a fleet
+of instances does not hit the site in the same second, and at most
+REFRESH_CONCURRENCY pages are fetched at once.
 """
 
-import asyncio
+import heapq
 import logging
-from datetime import datetime, time
+import os
+import random
 import threading
 import time as time_module
-from company_logic import crawl_relevant_pages, BASE_URL
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from company_logic import refresh_page, refresh_targets
+from metrics import Counter, Gauge
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def update_microbot_information():
+# Bounds for each page's refresh interval, and the interval new pages start with
+REFRESH_MIN_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "300"))
+REFRESH_MAX_INTERVAL = float(os.getenv("REFRESH_MAX_INTERVAL", "86400"))
+REFRESH_INITIAL_INTERVAL = float(os.getenv("REFRESH_INITIAL_INTERVAL", "3600"))
+
+# Interval multipliers applied when a page changed / stayed the same
+REFRESH_SPEEDUP = 0.5
+REFRESH_BACKOFF = 1.5
+
+# Each delay is randomly stretched or shrunk by up to this fraction
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))
+
+# Most pages fetched at the same time
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "2"))
+
+REFRESHES = Counter("chatbot_refreshes_total", "Page refreshes by outcome (changed, unchanged or error)", ("outcome",))
+REFRESH_INTERVAL = Gauge("chatbot_refresh_interval_seconds", "Current refresh interval per page", ("url",))
+REFRESH_IN_FLIGHT = Gauge("chatbot_refreshes_in_flight", "Page refreshes currently running")
+
+
+class PageSchedule:
     """
-    Update microbot information by crawling relevant pages.
+    Refresh state of one URL.
     """
-    try:
-        logger.info(f"Starting scheduled update at {datetime.now()}")
-        
-        # Crawl the website to discover relevant pages
-        crawled_urls = crawl_relevant_pages(BASE_URL)
-        
-        # Clear the existing cache to force refresh
-        from company_logic import CRAWLED_URLS
-        CRAWLED_URLS.clear()
-        
-        # Update with new crawled URLs
-        CRAWLED_URLS.update(crawled_urls)
-        
-        logger.info(f"Successfully updated URLs: {list(CRAWLED_URLS.keys())}")
-        return True
-    except Exception as e:
-        logger.error(f"Error during scheduled update: {str(e)}")
-        return False
-
-def run_scheduler():
+    __slots__ = ("url", "interval", "due", "running")
+
+    def __init__(self, url: str, interval: float, due: float):
+        self.url = url
+        self.interval = interval
+        self.due = due
+        self.running = False
+
+
+class RefreshScheduler:
     """
-    Run the scheduler to update information daily at midnight.
+    Per-URL adaptive refresh scheduler.
+
+    clock, rng and executor are injectable: with a fake clock and
+    executor=None, calling run_pending() refreshes due pages inline, which
+    makes the schedule deterministic to drive step by step.
     """
-    while True:
-        # Get current time
-        now = datetime.now()
-        
-        # Calculate time until next midnight
-        tomorrow = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        if tomorrow <= now:
-            tomorrow = tomorrow.replace(day=tomorrow.day + 1)
-        
-        # Calculate seconds until midnight
-        seconds_until_midnight = (tomorrow - now).total_seconds()
-        
-        logger.info(f"Next update scheduled for {tomorrow}")
-        logger.info(f"Sleeping for {seconds_until_midnight} seconds")
-        
-        # Sleep until midnight
-        time_module.sleep(seconds_until_midnight)
-        
-        # Perform the update
-        update_microbot_information()
-        
-        # Small delay to ensure we don't run multiple times in the same second
-        time_module.sleep(1)
+    def __init__(self, refresh=refresh_page, targets=refresh_targets, clock=time_module.monotonic,
+                 rng: random.Random = None, executor=None,
+                 min_interval: float = REFRESH_MIN_INTERVAL, max_interval: float = REFRESH_MAX_INTERVAL,
+                 initial_interval: float = REFRESH_INITIAL_INTERVAL, jitter: float = REFRESH_JITTER,
+                 concurrency: int = REFRESH_CONCURRENCY):
+        self.refresh = refresh
+        self.targets = targets
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.executor = executor
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.pages = {}
+        self._heap = []
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def _jittered(self, delay: float) -> float:
+        return delay * (1.0 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _push(self, page: PageSchedule):
+        heapq.heappush(self._heap, (page.due, page.url))
+
+    def sync_targets(self):
+        """
+        Start tracking newly discovered URLs and drop ones no longer linked.
+        Caller holds the lock.
+        """
+        now = self.clock()
+        targets = self.targets()
+        for url in targets:
+            if url not in self.pages:
+                # Spread first refreshes over the initial interval instead of all at once
+                page = PageSchedule(url, self.initial_interval, now + self.rng.uniform(0, self.initial_interval))
+                self.pages[url] = page
+                self._push(page)
+                REFRESH_INTERVAL.set(page.interval, url=url)
+        for url in list(self.pages):
+            if url not in targets and not self.pages[url].running:
+                del self.pages[url]
+
+    def _next_interval(self, interval: float, outcome: str) -> float:
+        if outcome == "changed":
+            interval *= REFRESH_SPEEDUP
+        else:
+            # Errors back off like unchanged pages so a failing host is not hammered
+            interval *= REFRESH_BACKOFF
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _finish(self, page: PageSchedule, outcome: str):
+        with self._lock:
+            self._running -= 1
+            REFRESH_IN_FLIGHT.set(self._running)
+            page.running = False
+            page.interval = self._next_interval(page.interval, outcome)
+            page.due = self.clock() + self._jittered(page.interval)
+            REFRESH_INTERVAL.set(page.interval, url=page.url)
+            if self.pages.get(page.url) is page:
+                self._push(page)
+        REFRESHES.inc(outcome=outcome)
+        # A slot is free again, so a waiting page may be due now
+        self._wakeup.set()
+
+    def _refresh(self, page: PageSchedule):
+        try:
+            outcome = "changed" if self.refresh(page.url) else "unchanged"
+        except Exception as e:
+            logger.error(f"Error refreshing {page.url}: {str(e)}")
+            outcome = "error"
+        self._finish(page, outcome)
+
+    def run_pending(self):
+        """
+        Start refreshes for every due page, up to the concurrency cap.
+        Returns the clock time of the next due page, or None if there is none.
+        """
+        started = []
+        with self._lock:
+            self.sync_targets()
+            now = self.clock()
+            while self._heap and self._running < self.concurrency:
+                due, url = self._heap[0]
+                page = self.pages.get(url)
+                # Skip heap entries left behind by rescheduled or dropped pages
+                if page is None or page.due != due or page.running:
+                    heapq.heappop(self._heap)
+                    continue
+                if due > now:
+                    break
+                heapq.heappop(self._heap)
+                page.running = True
+                self._running += 1
+                started.append(page)
+            REFRESH_IN_FLIGHT.set(self._running)
+        for page in started:
+            if self.executor is None:
+                self._refresh(page)
+            else:
+                self.executor.submit(self._refresh, page)
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def sleep_time(self, next_due):
+        """
+        How long run_forever sleeps after run_pending() returned next_due:
+        None (until woken) while every slot is busy, since no page can start
+        before a refresh finishes, otherwise until the next page is due.
+        """
+        with self._lock:
+            if self._running >= self.concurrency:
+                return None
+        return self.initial_interval if next_due is None else max(0.0, next_due - self.clock())
+
+    def run_forever(self):
+        """
+        Refresh pages as they fall due until the process exits.
+        """
+        while True:
+            self._wakeup.clear()
+            delay = self.sleep_time(self.run_pending())
+            if delay is None:
+                logger.debug("All refresh slots busy; waiting for a refresh to finish")
+            else:
+                logger.info(f"Next refresh due at {datetime.now() + timedelta(seconds=delay)}")
+            # A finishing refresh sets _wakeup, so a freed slot is never missed
+            self._wakeup.wait(delay)
+
 
 def start_scheduler_in_background():
     """
     Start the scheduler in a background thread.
     """
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+    scheduler = RefreshScheduler(executor=ThreadPoolExecutor(max_workers=REFRESH_CONCURRENCY,
+                                                           thread_name_prefix="refresh"))
+    scheduler_thread = threading.Thread(target=scheduler.run_forever, name="scheduler", daemon=True)
     scheduler_thread.start()
     logger.info("Scheduler started in background thread")
-    return scheduler_thread
+    return scheduler
+
 
 # Start the scheduler when this module is imported
 if __name__ != "__main__":
-    start_scheduler_in_background()
\ No newline at end of file
+    SCHEDULER = start_scheduler_in_background()
@@ -0,0 +1,203 @@
+"""
+Spelling module for the chatbot system.
+This module corrects misspelled keywords ("payrol", "attendence", "hrm")
+with a SymSpell-style deletion index built once from the microbot and
+section keywords, so each message token is checked with a few dictionary
+lookups instead of an edit-distance scan over every keyword.
+
+Tokens that are common English words (common_words.txt) are never
+corrected, so "new" stays "new" rather than becoming the keyword "news".
+"""
+
+import logging
+import os
+import re
+import company_logic
+from microbots import MICROBOTS
+from routing_snapshot import load_or_build
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Largest edit distance corrected for long tokens; 0 turns correction off
+TYPO_MAX_EDIT_DISTANCE = int(os.getenv("TYPO_MAX_EDIT_DISTANCE", "2"))
+
+# Tokens shorter than this are never corrected
+TYPO_MIN_LENGTH = 3
+
+# Correctly spelled words that are never corrected into keywords
+COMMON_WORDS_PATH = os.getenv("COMMON_WORDS_PATH", os.path.join(_HERE, "common_words.txt"))
+
+# Longer messages are prose, not keyword lookups, and are never corrected
+TYPO_MAX_MESSAGE_LENGTH = 500
+
+# Corrections remembered per token; ordinary words recur in nearly every message
+TYPO_CACHE_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[\w-]+")
+
+
+def _deletes(word: str, distance: int) -> set:
+    """
+    All strings reachable from word by deleting up to `distance` characters.
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between a and b, or limit + 1 once it
+    is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def allowed_distance(token: str, max_distance: int) -> int:
+    """
+    Edit distance tolerated for a token of this length. Short tokens are
+    too easily turned into some other keyword, so they get less slack.
+    """
+    if len(token) < TYPO_MIN_LENGTH:
+        return 0
+    if len(token) < 8:
+        return min(max_distance, 1)
+    return max_distance
+
+
+class SpellingIndex:
+    """
+    Deletion-neighbourhood index mapping misspelled tokens to known words.
+    Tokens in `common` are correctly spelled words and are left alone.
+    """
+    def __init__(self, words, max_distance: int = TYPO_MAX_EDIT_DISTANCE, common=()):
+        self.max_distance = max_distance
+        self.common = frozenset(common)
+        self.words = {}
+        self.longest = 0
+        self._deletes = {}
+        self._cache = {}
+        for word in words:
+            # First occurrence wins ties, so keyword order acts as priority
+            if word in self.words:
+                continue
+            self.words[word] = len(self.words)
+            self.longest = max(self.longest, len(word))
+            for deleted in _deletes(word, max_distance):
+                self._deletes.setdefault(deleted, []).append(word)
+
+    def correct(self, token: str):
+        """
+        Return the known word closest to token, or None if token is already
+        known, is a common word, or nothing is within the allowed distance.
+        """
+        if token in self.words or token in self.common:
+            return None
+        try:
+            return self._cache[token]
+        except KeyError:
+            pass
+        best = self._lookup(token)
+        if len(self._cache) >= TYPO_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[token] = best
+        return best
+
+    def _lookup(self, token: str):
+        limit = allowed_distance(token, self.max_distance)
+        # Deletions grow with the square of the token length, so tokens that
+        # are too long to be within reach of any word are rejected up front
+        if limit == 0 or len(token) > self.longest + limit:
+            return None
+        best = None
+        best_key = None
+        seen = set()
+        for deleted in _deletes(token, limit):
+            for word in self._deletes.get(deleted, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                if abs(len(word) - len(token)) > limit:
+                    continue
+                distance = edit_distance(token, word, limit)
+                if distance > limit:
+                    continue
+                # Short tokens may only gain or lose a letter ("hrm" -> "hrms"), not change one
+                if len(token) < 5 and len(word) == len(token):
+                    continue
+                # Typos rarely hit the first letter; this keeps "raining" from becoming "training"
+                if word[0] != token[0]:
+                    continue
+                key = (distance, self.words[word])
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+        return best
+
+    def correct_message(self, message: str) -> str:
+        """
+        Return message in lowercase with misspelled tokens replaced.
+        """
+        def replace(match):
+            return self.correct(match.group(0)) or match.group(0)
+        return _TOKEN.sub(replace, message.lower())
+
+
+def keyword_vocabulary() -> list:
+    """
+    Every word of the microbot keywords and the section keyword lists,
+    in routing priority order.
+    """
+    keywords = [keyword for bot in MICROBOTS for keyword in bot.keywords]
+    for name, value in vars(company_logic).items():
+        if name.endswith("_KEYWORDS"):
+            keywords.extend(value)
+    return [token for keyword in keywords for token in _TOKEN.findall(keyword.lower())]
+
+
+def common_words(path: str = COMMON_WORDS_PATH) -> list:
+    """
+    Read the common word list, skipping comment lines. A missing file
+    leaves only the keywords known.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError as e:
+        logger.warning(f"Could not read common words from {path}: {str(e)}")
+        return []
+
+
+SPELLING_INDEX = load_or_build(
+    "spelling",
+    lambda: SpellingIndex(keyword_vocabulary(), common=common_words()),
+    TYPO_MAX_EDIT_DISTANCE, COMMON_WORDS_PATH,
+)
+
+
+def correct_typos(message: str) -> str:
+    """
+    Correct misspelled keywords in a message; returns it unchanged when
+    correction is turned off or the message is too long to be a lookup.
+    """
+    if TYPO_MAX_EDIT_DISTANCE <= 0 or len(message) > TYPO_MAX_MESSAGE_LENGTH:
+        return message
+    return SPELLING_INDEX.correct_message(message)
@@ -0,0 +1,19 @@
+"""
+Test configuration for the chatbot apps.
+The three apps share their support modules (copied into each app) and
+import them by bare name, so the tests run against one app directory put on
+sys.path: company_chatbot by default, or the one named by CHATBOT_TENANT.
+
+Example:
+    CHATBOT_TENANT=hrms_chatbot python -m pytest -q tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TENANT = os.getenv("CHATBOT_TENANT", "company_chatbot")
+
+os.environ.setdefault("LOCAL_TESTING", "true")
+os.environ.setdefault("ANALYTICS_ENABLED", "false")
+sys.path.insert(0, os.path.join(ROOT, TENANT))
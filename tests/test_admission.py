@@ -0,0 +1,149 @@
+"""
+Tests for admission control: the priority gate's slot and queue accounting.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from admission import RATE_LIMITER, PriorityGate, Shed, admit
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_free_slots_are_granted_at_once():
+    async def scenario():
+        gate = PriorityGate(capacity=2, max_queue=4)
+        await gate.acquire(0, 1.0)
+        await gate.acquire(0, 1.0)
+        assert (gate.active, gate.queued) == (2, 0)
+        gate.release(0.01)
+        gate.release(0.01)
+        assert (gate.active, gate.queued) == (0, 0)
+    run(scenario())
+
+
+def test_freed_slot_goes_to_highest_priority_waiter():
+    async def scenario():
+        gate = PriorityGate(capacity=1, max_queue=4)
+        await gate.acquire(0, 1.0)
+        order = []
+
+        async def wait(priority, name):
+            await gate.acquire(priority, 5.0)
+            order.append(name)
+
+        page = asyncio.create_task(wait(1, "page"))
+        await asyncio.sleep(0)
+        microbot = asyncio.create_task(wait(0, "microbot"))
+        await asyncio.sleep(0)
+        assert gate.queued == 2
+        gate.release(0.01)
+        await asyncio.sleep(0)
+        gate.release(0.01)
+        await asyncio.gather(page, microbot)
+        assert order == ["microbot", "page"]
+        assert (gate.active, gate.queued) == (1, 0)
+    run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        gate = PriorityGate(capacity=1, max_queue=1)
+        gate.service_time = 0.0
+        await gate.acquire(0, 1.0)
+        waiter = asyncio.create_task(gate.acquire(0, 5.0))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed):
+            await gate.acquire(0, 5.0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+    run(scenario())
+
+
+def test_timed_out_waiter_is_shed_and_unqueued():
+    async def scenario():
+        gate = PriorityGate(capacity=1, max_queue=4)
+        gate.service_time = 0.0
+        await gate.acquire(0, 1.0)
+        with pytest.raises(Shed):
+            await gate.acquire(0, 0.01)
+        assert (gate.active, gate.queued) == (1, 0)
+        gate.release(0.01)
+        assert gate.active == 0
+    run(scenario())
+
+
+def test_cancelled_waiter_does_not_block_later_requests():
+    async def scenario():
+        gate = PriorityGate(capacity=1, max_queue=4)
+        await gate.acquire(0, 1.0)
+        waiter = asyncio.create_task(gate.acquire(0, 5.0))
+        await asyncio.sleep(0)
+        assert gate.queued == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert (gate.active, gate.queued) == (1, 0)
+        gate.release(0.01)
+        assert gate.active == 0
+        # Takes the fast path again rather than queueing behind a ghost waiter
+        await asyncio.wait_for(gate.acquire(0, 0.05), 0.1)
+        assert (gate.active, gate.queued) == (1, 0)
+    run(scenario())
+
+
+def test_waiter_cancelled_after_being_granted_hands_the_slot_on():
+    async def scenario():
+        gate = PriorityGate(capacity=1, max_queue=4)
+        await gate.acquire(0, 1.0)
+        waiter = asyncio.create_task(gate.acquire(0, 5.0))
+        await asyncio.sleep(0)
+        # Grant the slot, then cancel before the waiter gets to run
+        gate.release(0.01)
+        waiter.cancel()
+        [outcome] = await asyncio.gather(waiter, return_exceptions=True)
+        if not isinstance(outcome, BaseException):
+            # Some Python versions let the granted acquire win over the cancel; then the caller owns the slot
+            gate.release(0.01)
+        assert (gate.active, gate.queued) == (0, 0)
+        await asyncio.wait_for(gate.acquire(0, 0.05), 0.1)
+        assert gate.active == 1
+    run(scenario())
+
+
+def fake_request(host: str):
+    return SimpleNamespace(client=SimpleNamespace(host=host), headers={}, state=SimpleNamespace())
+
+
+def test_rate_limited_client_is_rejected_before_routing():
+    routed = []
+
+    async def route():
+        routed.append(True)
+        return "microbot"
+
+    async def scenario():
+        request = fake_request("test-over-limit")
+        while RATE_LIMITER.check("test-over-limit") == 0:
+            pass
+        with pytest.raises(HTTPException) as rejected:
+            async with admit(request, route):
+                pass
+        assert rejected.value.status_code == 429
+    run(scenario())
+    assert routed == []
+
+
+def test_admitted_request_is_routed_and_tagged():
+    async def route():
+        return "microbot"
+
+    async def scenario():
+        request = fake_request("test-within-limit")
+        async with admit(request, route):
+            assert request.state.tier == "microbot"
+    run(scenario())
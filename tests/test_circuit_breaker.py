@@ -0,0 +1,101 @@
+"""
+Tests for the circuit breaker state machine, driven with a fake clock.
+"""
+
+from circuit_breaker import (BREAKER_MIN_CALLS, BREAKER_OPEN_SECONDS, BREAKER_SLOW_CALL_SECONDS, CLOSED,
+                             HALF_OPEN, OPEN, CircuitBreaker)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def tripped_breaker(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker("upstream.test", clock=clock)
+    for _ in range(BREAKER_MIN_CALLS):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_stays_closed_below_minimum_calls():
+    breaker = CircuitBreaker("upstream.test", clock=FakeClock())
+    for _ in range(BREAKER_MIN_CALLS - 1):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_healthy_calls_keep_it_closed():
+    breaker = CircuitBreaker("upstream.test", clock=FakeClock())
+    for _ in range(BREAKER_MIN_CALLS * 4):
+        breaker.record_success(0.01)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_failures_open_the_circuit_and_reject_calls():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now = BREAKER_OPEN_SECONDS - 0.1
+    assert not breaker.allow()
+    assert breaker.state == OPEN
+
+
+def test_slow_calls_open_the_circuit():
+    breaker = CircuitBreaker("upstream.test", clock=FakeClock())
+    for _ in range(BREAKER_MIN_CALLS):
+        breaker.record_success(BREAKER_SLOW_CALL_SECONDS)
+    assert breaker.state == OPEN
+
+
+def test_half_open_after_cool_down_allows_one_probe():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    clock.now = BREAKER_OPEN_SECONDS
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # The probe is still in flight, so nothing else gets through
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_circuit():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    clock.now = BREAKER_OPEN_SECONDS
+    assert breaker.allow()
+    breaker.record_success(0.01)
+    assert breaker.state == CLOSED
+    # The window starts over, so one failure does not reopen it
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_or_slow_probe_reopens_the_circuit():
+    for record in (lambda breaker: breaker.record_failure(),
+                   lambda breaker: breaker.record_success(BREAKER_SLOW_CALL_SECONDS)):
+        clock = FakeClock()
+        breaker = tripped_breaker(clock)
+        clock.now = BREAKER_OPEN_SECONDS
+        assert breaker.allow()
+        record(breaker)
+        assert breaker.state == OPEN
+        assert breaker.opened_at == clock.now
+        assert not breaker.allow()
+
+
+def test_cancelled_probe_frees_its_slot():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    clock.now = BREAKER_OPEN_SECONDS
+    assert breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
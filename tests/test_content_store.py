@@ -0,0 +1,61 @@
+"""
+Tests for the content store and the cursors used to continue long answers.
+"""
+
+from company_logic import CHAT_TEXT_LIMIT, page_slice
+from content_store import ContentStore, make_cursor
+
+
+def test_cursor_resolves_to_page_and_offset():
+    store = ContentStore()
+    page = store.put("https://example.com/about", "a" * 100)
+    assert store.get("https://example.com/about") is page
+    assert store.resolve(make_cursor(page, 40)) == (page, 40)
+
+
+def test_unchanged_text_keeps_cursors_and_updates_metadata():
+    store = ContentStore()
+    page = store.put("https://example.com/about", "text", body_hash="one")
+    cursor = make_cursor(page, 2)
+    again = store.put("https://example.com/about", "text", body_hash="two", summary="short")
+    assert again is page
+    assert (page.body_hash, page.summary) == ("two", "short")
+    assert store.resolve(cursor) == (page, 2)
+
+
+def test_changed_text_makes_old_cursors_stale():
+    store = ContentStore()
+    old = store.put("https://example.com/about", "old text")
+    cursor = make_cursor(old, 3)
+    new = store.put("https://example.com/about", "new text")
+    assert store.resolve(cursor) is None
+    assert store.resolve(make_cursor(new, 3)) == (new, 3)
+    assert len(store) == 1
+
+
+def test_same_text_on_different_pages_gets_different_ids():
+    store = ContentStore()
+    first = store.put("https://example.com/a", "shared")
+    second = store.put("https://example.com/b", "shared")
+    assert first.doc_id != second.doc_id
+
+
+def test_invalid_cursors_do_not_resolve():
+    store = ContentStore()
+    page = store.put("https://example.com/about", "text")
+    for cursor in (None, "", "nodot", f"{page.doc_id}.", f"{page.doc_id}.-1", f"{page.doc_id}.x",
+                   f"unknown.{0}", "."):
+        assert store.resolve(cursor) is None, cursor
+
+
+def test_slices_follow_cursors_to_the_end():
+    store = ContentStore()
+    text = "".join(chr(ord("a") + index % 26) for index in range(CHAT_TEXT_LIMIT * 2 + 10))
+    page = store.put("https://example.com/long", text)
+    pieces, offset = [], 0
+    while offset is not None:
+        resolved_page, resolved_offset = store.resolve(make_cursor(page, offset))
+        reply, offset = page_slice(resolved_page, resolved_offset)
+        pieces.append(reply[:CHAT_TEXT_LIMIT] if offset is not None else reply)
+    assert len(pieces) == 3
+    assert "".join(pieces) == text
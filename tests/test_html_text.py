@@ -0,0 +1,53 @@
+"""
+Tests for html_text: the streamed page text matches the one-shot cleanup it
+replaced, and stays linear in the page size.
+"""
+
+import random
+import time
+
+from html_text import iter_page_text, parse_html
+
+FRAGMENTS = ["<p>", "</p>", "<b>", "</b>", "<div>", "</div>", "<br>", "a", "bc  d", "e   f", " ", "  ",
+             "\n", "\r", "\r\n", "\x0b", "x\ny", "<script>var s;</script>", "<style>p {}</style>"]
+
+
+def cleaned_in_one_go(html: str) -> str:
+    soup = parse_html(html)
+    for script in soup(["script", "style"]):
+        script.decompose()
+    lines = [line.strip() for line in soup.get_text().splitlines()]
+    chunks = [phrase for line in lines for phrase in line.split("  ")]
+    return " ".join(chunk for chunk in chunks if chunk)
+
+
+def one_line_page(size: int) -> str:
+    unit = "<span>Lorem ipsum dolor sit amet,</span>  <b>consectetur</b> adipiscing elit. "
+    return "<html><body>" + unit * (size // len(unit)) + "</body></html>"
+
+
+def text_seconds(html: str) -> float:
+    best = None
+    for _ in range(3):
+        soup = parse_html(html)
+        started = time.perf_counter()
+        "".join(iter_page_text(soup))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_matches_one_shot_cleanup():
+    rnd = random.Random(7)
+    for _ in range(2000):
+        html = "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(0, 40)))
+        assert "".join(iter_page_text(parse_html(html))) == cleaned_in_one_go(html), html
+
+
+def test_minified_page_is_linear():
+    html = one_line_page(100_000)
+    assert "".join(iter_page_text(parse_html(html))) == cleaned_in_one_go(html)
+    small = text_seconds(html)
+    large = text_seconds(one_line_page(400_000))
+    # Four times the text; a quadratic walk takes about sixteen times as long
+    assert large < small * 8
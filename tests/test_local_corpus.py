@@ -0,0 +1,34 @@
+"""
+Tests for serving local mode from the in-memory local corpus.
+"""
+
+import os
+
+import company_logic
+from content_store import ContentStore
+
+
+def test_warm_up_parses_each_local_file_once(monkeypatch):
+    # Local data paths are relative to the app directory, where the app is run from
+    monkeypatch.chdir(os.path.dirname(company_logic.__file__))
+    extracted = []
+    extract_page = company_logic.extract_page
+
+    def counting_extract(html, stats=None):
+        extracted.append(html)
+        return extract_page(html, stats)
+
+    corpus = company_logic.LocalCorpus(company_logic.LOCAL_DATA_DIR, counting_extract, company_logic.body_hash)
+    monkeypatch.setattr(company_logic, "extract_page", counting_extract)
+    monkeypatch.setattr(company_logic, "LOCAL_CORPUS", corpus)
+    monkeypatch.setattr(company_logic, "CONTENT_STORE", ContentStore())
+
+    stats = company_logic.refresh_pages()
+    # Sections without a local file fail to refresh; every file that exists is stored
+    assert stats["changed"] > 0
+    assert len(extracted) == len(corpus.files)
+    for url in company_logic.refresh_targets():
+        page = company_logic.CONTENT_STORE.get(url)
+        if page is not None:
+            local = corpus.get(company_logic.local_file_name(url))
+            assert (page.text, page.summary, page.body_hash) == (local.text, local.summary, local.body_hash)
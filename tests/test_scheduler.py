@@ -0,0 +1,131 @@
+"""
+Tests for the adaptive refresh scheduler, driven step by step with a fake
+clock. With executor=None, run_pending() refreshes due pages inline.
+"""
+
+import random
+
+from scheduler import REFRESH_BACKOFF, RefreshScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PendingExecutor:
+    """
+    Executor that holds submitted refreshes until the test runs them.
+    """
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, function, *args):
+        self.jobs.append((function, args))
+
+    def run_one(self):
+        function, args = self.jobs.pop(0)
+        function(*args)
+
+
+def make_scheduler(urls, refresh, clock, **kwargs):
+    options = dict(min_interval=10, max_interval=1000, initial_interval=100, jitter=0.1, concurrency=8,
+                   executor=None)
+    options.update(kwargs)
+    return RefreshScheduler(refresh=refresh, targets=lambda: urls, clock=clock, rng=random.Random(1), **options)
+
+
+def drive(scheduler: RefreshScheduler, clock: FakeClock, until: float):
+    """
+    Run the schedule, jumping the clock to each due time, up to `until`.
+    """
+    while True:
+        next_due = scheduler.run_pending()
+        if next_due is None or next_due > until:
+            return
+        clock.now = max(clock.now, next_due)
+
+
+def test_intervals_converge_to_bounds():
+    clock = FakeClock()
+    scheduler = make_scheduler(["busy", "static"], lambda url: url == "busy", clock)
+    drive(scheduler, clock, until=50000)
+    assert scheduler.pages["busy"].interval == 10
+    assert scheduler.pages["static"].interval == 1000
+
+
+def test_unchanged_page_backs_off_step_by_step():
+    clock = FakeClock()
+    scheduler = make_scheduler(["page"], lambda url: False, clock, jitter=0)
+    scheduler.run_pending()
+    intervals = []
+    for _ in range(4):
+        clock.now = scheduler.pages["page"].due
+        scheduler.run_pending()
+        intervals.append(scheduler.pages["page"].interval)
+    assert intervals == [100 * REFRESH_BACKOFF ** step for step in range(1, 5)]
+
+
+def test_jitter_stays_within_bounds():
+    clock = FakeClock()
+    refreshed = {}
+
+    def refresh(url):
+        refreshed.setdefault(url, []).append(clock.now)
+        return False
+
+    urls = [f"page{index}" for index in range(20)]
+    # A fixed interval, so every gap between refreshes is one jittered delay
+    scheduler = make_scheduler(urls, refresh, clock, min_interval=100, max_interval=100)
+    drive(scheduler, clock, until=5000)
+    first = [times[0] for times in refreshed.values()]
+    assert all(0 <= time <= 100 for time in first)
+    gaps = [later - earlier for times in refreshed.values() for earlier, later in zip(times, times[1:])]
+    assert len(gaps) > 500
+    assert all(90 <= gap <= 110 for gap in gaps)
+    assert max(gaps) - min(gaps) > 10
+
+
+def test_concurrency_cap():
+    clock = FakeClock()
+    in_flight = []
+    scheduler = None
+
+    def refresh(url):
+        in_flight.append(scheduler._running)
+        return False
+
+    scheduler = make_scheduler([f"page{index}" for index in range(5)], refresh, clock, concurrency=2)
+    # First refreshes are spread over the initial interval, so all are due by then
+    scheduler.run_pending()
+    clock.now = 100
+    scheduler.run_pending()
+    assert len(in_flight) == 2
+    scheduler.run_pending()
+    scheduler.run_pending()
+    assert len(in_flight) == 5
+    assert max(in_flight) <= 2
+
+
+def test_waits_for_a_free_slot_instead_of_spinning():
+    clock = FakeClock()
+    executor = PendingExecutor()
+    scheduler = make_scheduler(["a", "b", "c"], lambda url: False, clock, concurrency=2, executor=executor)
+    scheduler.run_pending()
+    clock.now = 100
+    scheduler._wakeup.clear()
+    next_due = scheduler.run_pending()
+    assert len(executor.jobs) == 2
+    # The third page is overdue, but no slot is free to refresh it
+    assert next_due <= clock.now
+    assert scheduler.sleep_time(next_due) is None
+    assert not scheduler._wakeup.is_set()
+
+    executor.run_one()
+    assert scheduler._wakeup.is_set()
+    assert scheduler.sleep_time(next_due) == 0.0
+    scheduler.run_pending()
+    assert len(executor.jobs) == 2
@@ -0,0 +1,65 @@
+"""
+Tests for the session store's expiry and caps and follow-up detection.
+"""
+
+from sessions import MAX_SESSION_ID_LENGTH, SessionStore, is_follow_up
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_update_and_get():
+    store = SessionStore(clock=FakeClock())
+    store.update("s1", last_bot="about", section_url="https://example.com/about", text_offset=10)
+    session = store.get("s1")
+    assert (session.last_bot, session.section_url, session.text_offset) == \
+        ("about", "https://example.com/about", 10)
+    assert store.get("missing") is None
+    assert store.get("") is None
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=60, clock=clock)
+    store.update("s1", last_bot="about")
+    clock.now = 60
+    assert store.get("s1") is not None
+    clock.now = 61
+    assert store.get("s1") is None
+    assert len(store) == 0
+
+
+def test_count_cap_evicts_least_recently_used():
+    store = SessionStore(max_count=2, clock=FakeClock())
+    store.update("a")
+    store.update("b")
+    store.update("a")
+    store.update("c")
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+
+
+def test_byte_cap_bounds_memory():
+    store = SessionStore(max_bytes=2000, clock=FakeClock())
+    for index in range(100):
+        store.update(f"session-{index}")
+    assert 0 < len(store) < 100
+    assert store.bytes_used <= 2000
+    assert store.get("session-99") is not None
+
+
+def test_overlong_session_ids_are_ignored():
+    store = SessionStore(clock=FakeClock())
+    store.update("x" * (MAX_SESSION_ID_LENGTH + 1))
+    assert len(store) == 0
+
+
+def test_follow_up_phrases():
+    assert is_follow_up("Tell me more!")
+    assert is_follow_up("  go   on ")
+    assert not is_follow_up("tell me more about your services")
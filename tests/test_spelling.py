@@ -0,0 +1,47 @@
+"""
+Tests for typo correction: misspelled keywords are fixed, while correctly
+spelled English words are never turned into keywords.
+"""
+
+import pytest
+
+from spelling import SpellingIndex, correct_typos
+
+# Correctly spelled messages that were once "corrected" into keywords and misrouted
+ENGLISH_MESSAGES = [
+    "what is new?",
+    "how do I change my password",
+    "I signed the contract",
+    "hiking trail nearby",
+    "I feel great",
+    "is it raining",
+]
+
+
+def small_index():
+    keywords = ["payroll", "attendance", "news", "charge", "contact", "trial", "fee", "training", "hrms"]
+    return SpellingIndex(keywords, max_distance=2, common=["new", "change", "contract", "trail", "feel", "raining"])
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("payrol", "payroll"),
+    ("attendence", "attendance"),
+    ("contatc", "contact"),
+    ("hrm", "hrms"),
+])
+def test_misspelled_keywords_are_corrected(token, expected):
+    assert small_index().correct(token) == expected
+
+
+@pytest.mark.parametrize("token", ["new", "change", "contract", "trail", "feel", "raining", "payroll"])
+def test_known_words_are_left_alone(token):
+    assert small_index().correct(token) is None
+
+
+def test_overlong_tokens_are_not_corrected():
+    assert small_index().correct("payroll" * 100) is None
+
+
+@pytest.mark.parametrize("message", ENGLISH_MESSAGES)
+def test_english_messages_are_not_rewritten(message):
+    assert correct_typos(message) == message.lower()
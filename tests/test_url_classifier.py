@@ -0,0 +1,114 @@
+"""
+Tests for url_classifier: the data-driven section rules classify links
+exactly like the if/elif chains they replaced, kept here as fixtures.
+"""
+
+import random
+from urllib.parse import urljoin, urlparse
+
+import pytest
+
+from company_logic import BASE_URL, SECTION_RULES
+from url_classifier import SectionClassifier
+
+
+def company_chain(path: str):
+    # company_chatbot and hrms_chatbot before the section rules
+    if 'about' in path:
+        return 'about'
+    elif 'contact' in path:
+        return 'contact'
+    elif 'blog' in path or 'news' in path:
+        return 'blog'
+    elif 'service' in path or 'product' in path:
+        return 'service'
+    return None
+
+
+def school_chain(path: str):
+    # school_chatbot before the section rules
+    if 'about' in path:
+        return 'about'
+    elif 'contact' in path:
+        return 'contact'
+    elif 'activities' in path or 'events' in path:
+        return 'activities'
+    elif 'academics' in path or 'curriculum' in path:
+        return 'academics'
+    elif 'students' in path or 'pupils' in path:
+        return 'students'
+    elif 'faculty' in path or 'teachers' in path:
+        return 'faculty'
+    elif 'blog' in path or 'news' in path:
+        return 'blog'
+    elif 'service' in path or 'product' in path:
+        return 'service'
+    return None
+
+
+CHAINS = {
+    ("about", "contact", "blog", "service"): company_chain,
+    ("about", "contact", "activities", "academics", "students", "faculty", "blog", "service"): school_chain,
+}
+
+
+@pytest.fixture
+def old_chain():
+    """
+    The old classification loop for this app's sections.
+    """
+    chain = CHAINS[tuple(section for section, _ in SECTION_RULES)]
+
+    def classify_links(base_url: str, hrefs: list) -> dict:
+        found = {}
+        for href in hrefs:
+            absolute_url = urljoin(base_url, href)
+            if urlparse(absolute_url).netloc == urlparse(base_url).netloc:
+                section = chain(urlparse(absolute_url).path.lower())
+                if section is not None:
+                    found[section] = absolute_url
+        return found
+    return classify_links
+
+
+WORDS = ["about", "About-Us", "contact", "CONTACT", "blog", "news", "service", "products", "events",
+         "activities", "academics", "curriculum", "students", "pupils", "faculty", "teachers",
+         "home", "team", "careers", "x", "", "index.html", "Straße", "İnfo"]
+
+
+def random_href(rnd: random.Random, host: str) -> str:
+    path = "/".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 3)))
+    query = rnd.choice(["", "?ref=about", "#contact", "?q=1#news"])
+    form = rnd.randint(0, 7)
+    if form == 0:
+        return f"https://{host}/{path}{query}"
+    if form == 1:
+        return f"http://{host}/{path}{query}"
+    if form == 2:
+        return f"//{host}/{path}{query}"
+    if form == 3:
+        return f"https://elsewhere.example/{path}{query}"
+    if form == 4:
+        return f"../{path}/./{rnd.choice(WORDS)}{query}"
+    if form == 5:
+        return f"{path}{query}"
+    if form == 6:
+        return f"mailto:{rnd.choice(WORDS)}@{host}"
+    return f"/{path}{query}"
+
+
+@pytest.mark.parametrize("base_url", [BASE_URL, "https://example.com/", "https://example.com/en/",
+                                      "https://example.com/about-us/index.html"])
+def test_matches_old_chain_on_random_links(old_chain, base_url):
+    rnd = random.Random(46)
+    host = urlparse(base_url).netloc
+    classifier = SectionClassifier(base_url, SECTION_RULES)
+    for _ in range(750):
+        hrefs = [random_href(rnd, host) for _ in range(rnd.randint(0, 30))]
+        assert classifier.classify_links(hrefs) == old_chain(base_url, hrefs), hrefs
+
+
+def test_last_link_of_a_section_wins():
+    classifier = SectionClassifier("https://example.com/", SECTION_RULES)
+    found = classifier.classify_links(["/about", "/team", "/about-us", "https://other.example/contact"])
+    assert found == {"about": "https://example.com/about-us"}
@@ -0,0 +1,69 @@
+"""
+Memory benchmark for the session store.
+
+Fills a tenant's SessionStore with synthetic sessions and reports the real
+memory cost per session (via tracemalloc) next to the store's own estimate,
+which is what SESSION_MAX_BYTES is enforced against.
+
+Example:
+    python tools/bench_sessions.py --tenant company_chatbot --sessions 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure session store memory per session")
+    parser.add_argument("--tenant", default="company_chatbot")
+    parser.add_argument("--sessions", type=int, default=100000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(ROOT, args.tenant))
+    from sessions import SessionStore
+
+    # Session IDs arrive from clients; build them up front so they are not counted
+    session_ids = [uuid.uuid4().hex for _ in range(args.sessions)]
+    bot_names = ["ServicesBot", "PricingBot", "SupportBot", None]
+    section_urls = ["https://example.com/about", "https://example.com/contact", None]
+
+    store = SessionStore(max_count=args.sessions, max_bytes=1 << 40, idle_ttl=3600)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    for index, session_id in enumerate(session_ids):
+        store.update(session_id, last_bot=bot_names[index % len(bot_names)],
+                     section_url=section_urls[index % len(section_urls)], text_offset=index % 2000)
+    insert_seconds = time.perf_counter() - started
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for session_id in session_ids:
+        store.get(session_id)
+    lookup_seconds = time.perf_counter() - started
+
+    measured = after - before
+    # The IDs themselves were allocated before tracing began, but the store keeps them alive
+    id_bytes = sum(sys.getsizeof(session_id) for session_id in session_ids)
+    print(json.dumps({
+        "sessions": len(store),
+        "measured_bytes": measured + id_bytes,
+        "measured_bytes_per_session": round((measured + id_bytes) / args.sessions, 1),
+        "estimated_bytes": store.bytes_used,
+        "estimated_bytes_per_session": round(store.bytes_used / args.sessions, 1),
+        "mb_per_100k_sessions": round((measured + id_bytes) / args.sessions * 100000 / 1e6, 2),
+        "insert_us": round(insert_seconds / args.sessions * 1e6, 2),
+        "lookup_us": round(lookup_seconds / args.sessions * 1e6, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Tail latency benchmark for hedged page fetches.
+
+Starts a jittery stand-in site in-process, then fetches pages through a
+tenant's company_logic.fetch_page with hedging disabled and enabled and
+reports the latency distribution of each run.
+
+Example:
+    python tools/hedge_bench.py --tenant company_chatbot --requests 400 \
+        --slow-fraction 0.05 --slow-latency 2.0
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from standin_site import StandInSite, serve  # noqa: E402
+from load_harness import percentile  # noqa: E402
+
+
+def summarize(latencies: list) -> dict:
+    """
+    Reduce a list of latencies (seconds) to the usual percentiles in ms.
+    """
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def run(company_logic, url: str, total: int, concurrency: int) -> list:
+    """
+    Fetch url `total` times and return the per-fetch latencies (failed
+    fetches included, so timeouts show up in the tail).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            company_logic.fetch_page(url)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    if errors:
+        print(f"{len(errors)} fetches failed: {sorted(set(errors))}", file=sys.stderr)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure fetch tail latency with and without hedging")
+    parser.add_argument("--tenant", default="company_chatbot", help="Chatbot directory to load company_logic from")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--warmup", type=int, default=50, help="Fetches used to seed the latency window")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--base-latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--budget-ratio", type=float, default=0.1, help="Max share of extra hedge requests")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    tenant_dir = os.path.join(ROOT, args.tenant)
+    sys.path.insert(0, tenant_dir)
+    import company_logic
+    import hedging
+
+    site = StandInSite(os.path.join(tenant_dir, "local_data"), args.base_latency, args.jitter,
+                       args.slow_fraction, args.slow_latency, args.seed)
+    server = serve(site, "127.0.0.1", args.port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{args.port}/about"
+
+    hedging.HEDGE_BUDGET.ratio = args.budget_ratio
+    hedging.HEDGING_ENABLED = False
+    run(company_logic, url, args.warmup, args.concurrency)
+
+    baseline = run(company_logic, url, args.requests, args.concurrency)
+
+    hedging.HEDGING_ENABLED = True
+    sent_before = sum(value for _, _, value in hedging.HEDGES_SENT.samples())
+    hedged_run = run(company_logic, url, args.requests, args.concurrency)
+    sent = sum(value for _, _, value in hedging.HEDGES_SENT.samples()) - sent_before
+    won = sum(value for _, _, value in hedging.HEDGES_WON.samples())
+
+    server.shutdown()
+    print(json.dumps({
+        "without_hedging": summarize(baseline),
+        "with_hedging": summarize(hedged_run),
+        "hedges_sent": int(sent),
+        "hedges_won": int(won),
+        "extra_load_pct": round(100.0 * sent / args.requests, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
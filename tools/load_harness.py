@@ -0,0 +1,246 @@
+"""
+Load harness for the chatbot apps.
+
+Drives concurrent requests against a running app (company, HRMS or school)
+and reports latency percentiles and bytes on the wire. With --compare-encodings
+the same workload is run uncompressed and compressed so the bandwidth and
+latency savings of response compression can be read off directly.
+
+With --background-concurrency, that many extra workers keep sending
+page-tier messages for the whole run, so the foreground latencies show
+whether fast replies hold their SLO while the fetch path is saturated.
+
+Example:
+    python tools/load_harness.py --url http://127.0.0.1:8000 --compare-encodings
+    python tools/load_harness.py --url http://127.0.0.1:8000 --background-concurrency 64
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_CHAT_MESSAGES = [
+    "hi",
+    "what services do you offer",
+    "tell me about pricing",
+    "is my data secure",
+    "how do I contact support",
+    "tell me about the company",
+]
+
+DEFAULT_BUTTONS = ["HRMS System", "SCHOOL System"]
+
+# Messages no FAQ entry or microbot answers, so they are served by page fetches
+DEFAULT_PAGE_MESSAGES = ["price", "product", "details", "info"]
+
+
+def percentile(values: list, pct: float) -> float:
+    """
+    Return the pct-th percentile of values using nearest-rank.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def build_workload(endpoint: str, messages: list) -> list:
+    """
+    Build the list of (path, json body) pairs to cycle through.
+    """
+    if endpoint == "/button":
+        return [("/button", {"button": button}) for button in messages]
+    return [(endpoint, {"message": message}) for message in messages]
+
+
+def run_load(base_url: str, workload: list, total: int, concurrency: int,
+             accept_encoding: str, headers: dict = None) -> dict:
+    """
+    Send `total` requests with `concurrency` workers and collect statistics.
+    """
+    local = threading.local()
+    latencies = []
+    statuses = {}
+    wire_bytes = [0]
+    body_bytes = [0]
+    lock = threading.Lock()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def one(index: int):
+        path, body = workload[index % len(workload)]
+        request_headers = {"Accept-Encoding": accept_encoding}
+        if headers:
+            request_headers.update(headers)
+        start = time.perf_counter()
+        response = session().post(base_url.rstrip("/") + path, json=body,
+                                  headers=request_headers, stream=True, timeout=60)
+        # Read the raw bytes so we measure what actually crossed the wire
+        raw = response.raw.read(decode_content=False)
+        elapsed = time.perf_counter() - start
+        decoded = len(_decode(raw, response.headers.get("Content-Encoding", "identity")))
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            wire_bytes[0] += len(raw)
+            body_bytes[0] += decoded
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    duration = time.perf_counter() - started
+
+    return {
+        "accept_encoding": accept_encoding,
+        "requests": total,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "wire_bytes": wire_bytes[0],
+        "body_bytes": body_bytes[0],
+        "statuses": statuses,
+    }
+
+
+def run_background(base_url: str, workload: list, concurrency: int, stop: threading.Event) -> dict:
+    """
+    Keep `concurrency` workers sending the workload until stop is set.
+    """
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        session = requests.Session()
+        index = offset
+        while not stop.is_set():
+            path, body = workload[index % len(workload)]
+            index += 1
+            start = time.perf_counter()
+            retry_after = 0.0
+            try:
+                response = session.post(base_url.rstrip("/") + path, json=body, timeout=60)
+                status = response.status_code
+                if status in (429, 503):
+                    retry_after = float(response.headers.get("Retry-After", "1"))
+            except requests.RequestException:
+                status = "error"
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+            # Back off like a well-behaved client instead of spinning on rejections
+            stop.wait(retry_after)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    stop.wait()
+    for thread in threads:
+        thread.join()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "statuses": statuses,
+    }
+
+
+def _decode(raw: bytes, encoding: str) -> bytes:
+    """
+    Decode a raw body so the uncompressed size can be reported.
+    """
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(raw)
+    return raw
+
+
+def compare_encodings(identity: dict, compressed: dict) -> dict:
+    """
+    Summarise the savings of the compressed run over the identity run.
+    """
+    def saving(before, after):
+        return round(100.0 * (before - after) / before, 1) if before else 0.0
+
+    return {
+        "wire_bytes_saved_pct": saving(identity["wire_bytes"], compressed["wire_bytes"]),
+        "p50_saved_pct": saving(identity["p50_ms"], compressed["p50_ms"]),
+        "p99_saved_pct": saving(identity["p99_ms"], compressed["p99_ms"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load harness for the chatbot apps")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running app")
+    parser.add_argument("--endpoint", default="/chat", choices=["/chat", "/button"])
+    parser.add_argument("--messages", help="File with one message (or button) per line")
+    parser.add_argument("--requests", type=int, default=500, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--accept-encoding", default="br, gzip",
+                        help="Accept-Encoding header to send for a single run")
+    parser.add_argument("--compare-encodings", action="store_true",
+                        help="Run once uncompressed and once compressed and report savings")
+    parser.add_argument("--background-concurrency", type=int, default=0,
+                        help="Workers sending page-tier messages throughout the run")
+    parser.add_argument("--background-messages", help="File with one background message per line")
+    parser.add_argument("--warmup-seconds", type=float, default=1.0,
+                        help="How long the background load runs before the foreground starts")
+    args = parser.parse_args()
+
+    if args.messages:
+        with open(args.messages, encoding="utf-8") as handle:
+            messages = [line.strip() for line in handle if line.strip()]
+    else:
+        messages = DEFAULT_BUTTONS if args.endpoint == "/button" else DEFAULT_CHAT_MESSAGES
+    workload = build_workload(args.endpoint, messages)
+
+    background = None
+    if args.background_concurrency:
+        if args.background_messages:
+            with open(args.background_messages, encoding="utf-8") as handle:
+                background_messages = [line.strip() for line in handle if line.strip()]
+        else:
+            background_messages = DEFAULT_PAGE_MESSAGES
+        stop = threading.Event()
+        result = {}
+        background = threading.Thread(target=lambda: result.update(run_background(
+            args.url, build_workload("/chat", background_messages), args.background_concurrency, stop)))
+        background.start()
+        # Let the background load fill the fetch path before measuring
+        time.sleep(args.warmup_seconds)
+
+    if args.compare_encodings:
+        identity = run_load(args.url, workload, args.requests, args.concurrency, "identity")
+        compressed = run_load(args.url, workload, args.requests, args.concurrency, args.accept_encoding)
+        report = {"identity": identity, "compressed": compressed,
+                  "savings": compare_encodings(identity, compressed)}
+    else:
+        report = run_load(args.url, workload, args.requests, args.concurrency, args.accept_encoding)
+
+    if background is not None:
+        stop.set()
+        background.join()
+        report = {"foreground": report, "background": result}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
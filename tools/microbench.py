@@ -0,0 +1,362 @@
+"""
+Microbenchmarks for the chatbot apps' hot paths.
+
+Times, for each tenant (company, HRMS and school):
+  * Microbot.can_handle over every microbot, and get_relevant_microbot,
+  * is_company_related and select_relevant_url,
+  * the HTML-to-text pipeline: extract_text and extract_page (text plus
+    summary) on a small and a large page, and fetch_local_content serving
+    them from the local corpus,
+  * reply serialization through reply_response, for a short deterministic
+    reply (pre-compressed variant) and a page-sized reply compressed per
+    request.
+
+Messages come from a synthetic corpus built from the tenant's own microbot
+keywords: "typical" short questions, "long" messages of a few kilobytes, and
+"adversarial" ones (keyword prefixes that never complete, a single
+space-free token, keywords glued together, non-ASCII text and punctuation
+runs) that stress the substring scans. The corpus is seeded, so runs are
+comparable.
+
+Like pytest-benchmark, each benchmark is calibrated so one round runs for
+at least --min-time seconds, then timed for --rounds rounds; min, median,
+mean and standard deviation are reported per call. Each tenant runs in its
+own interpreter, since the tenants' modules share names.
+
+With --save the result becomes a baseline file; with --baseline the run
+fails (exit code 1) when any benchmark's median regresses by more than
+--max-regression percent. --compare checks two saved results against each
+other without running anything.
+
+tools/microbench_baseline.json is the committed baseline, recorded with the
+default options on one CPU under Python 3.11. Timings only compare on like
+hardware, so a warning is printed when the baseline came from a different
+machine or Python; regenerate it there with --save before comparing, and
+re-save and commit it whenever a change moves the hot paths on purpose.
+
+Example:
+    python tools/microbench.py --baseline tools/microbench_baseline.json --max-regression 15
+    python tools/microbench.py --save tools/microbench_baseline.json
+    python tools/microbench.py --tenant hrms_chatbot --filter microbot
+    python tools/microbench.py --compare tools/microbench_baseline.json microbench_new.json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TENANTS = ("company_chatbot", "hrms_chatbot", "school_chatbot")
+
+# Everyday words that are not microbot keywords in any tenant
+FILLER_WORDS = (
+    "please", "could", "you", "tell", "me", "the", "a", "for", "my", "our", "team", "is", "there", "way", "to",
+    "get", "some", "more", "on", "when", "today", "next", "week", "thanks", "hello", "quick", "question",
+    "regarding", "this", "that", "would", "like", "know", "if", "it", "works", "with", "we", "are", "looking",
+)
+
+SEED = 20240601
+
+
+def synthetic_messages(kind: str, keywords: list, count: int = 200, seed: int = SEED) -> list:
+    """
+    Build a seeded list of chat messages of one kind: "typical", "long" or
+    "adversarial". keywords are the tenant's routing keywords.
+    """
+    rng = random.Random(f"{seed}-{kind}")
+    messages = []
+    for index in range(count):
+        if kind == "typical":
+            words = rng.choices(FILLER_WORDS, k=rng.randint(3, 10))
+            # Half the questions name a keyword somewhere, as real traffic does
+            if index % 2 == 0:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+            messages.append(" ".join(words))
+        elif kind == "long":
+            words = rng.choices(FILLER_WORDS, k=rng.randint(400, 900))
+            # The deciding keyword, if any, comes last so every scan reads the whole message
+            if index % 2 == 0:
+                words.append(rng.choice(keywords))
+            messages.append(" ".join(words))
+        elif kind == "adversarial":
+            keyword = rng.choice(keywords)
+            prefix = keyword[:max(1, len(keyword) - 1)]
+            variants = (
+                # Prefixes of a keyword that never complete it
+                " ".join([prefix] * rng.randint(500, 1500)),
+                # One huge token with no spaces
+                "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(5000, 10000))),
+                # Keywords glued together, so every one matches somewhere
+                "".join(rng.choices(keywords, k=rng.randint(200, 600))),
+                # Non-ASCII text whose lowercase form differs in length
+                "İstanbul ẞtraße ǅemal " * rng.randint(200, 500) + keyword,
+                # Punctuation and whitespace runs
+                "?!. ,;:" * rng.randint(500, 1500) + "\t\n " * 300,
+            )
+            messages.append(variants[index % len(variants)])
+        else:
+            raise ValueError(f"Unknown message kind: {kind}")
+    return messages
+
+
+def synthetic_page(paragraphs: int, seed: int = SEED) -> str:
+    """
+    Build a seeded HTML page with the usual chrome (navigation, scripts,
+    styles, footer) around `paragraphs` sections of prose.
+    """
+    rng = random.Random(f"{seed}-page-{paragraphs}")
+    parts = [
+        "<!DOCTYPE html><html><head><title>Synthetic page</title>",
+        "<style>body { font-family: sans-serif; } .nav a { margin: 0 4px; }</style>",
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>",
+        "</head><body><nav class=\"nav\">",
+        "".join(f"<a href=\"/{name}\">{name.title()}</a>" for name in ("home", "about", "services", "blog", "contact")),
+        "</nav><main>",
+    ]
+    for index in range(paragraphs):
+        parts.append(f"<section><h2>Section {index}</h2>")
+        for _ in range(rng.randint(2, 4)):
+            sentences = [" ".join(rng.choices(FILLER_WORDS, k=rng.randint(8, 20))).capitalize() + "."
+                         for _ in range(rng.randint(2, 5))]
+            parts.append(f"<p>{' '.join(sentences)}</p>")
+        parts.append("<ul>" + "".join(f"<li>Item {item} of section {index}</li>" for item in range(3)) + "</ul>")
+        parts.append("</section>")
+    parts.append("</main><footer><p>Copyright. All rights reserved.</p></footer></body></html>")
+    return "\n".join(parts)
+
+
+# Page sizes: a typical section page and a large landing page
+PAGE_SIZES = {"small": 4, "large": 400}
+
+
+def measure(function, min_time: float, rounds: int) -> dict:
+    """
+    Time a no-argument callable: calibrate the iterations per round so a
+    round lasts at least min_time, then time `rounds` rounds. Times are
+    microseconds per call.
+    """
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        per_call.append((time.perf_counter() - started) / iterations * 1e6)
+    median = statistics.median(per_call)
+    return {
+        "min_us": round(min(per_call), 3),
+        "median_us": round(median, 3),
+        "mean_us": round(statistics.mean(per_call), 3),
+        "stddev_us": round(statistics.stdev(per_call), 3) if rounds > 1 else 0.0,
+        "ops_per_second": round(1e6 / median, 1) if median else None,
+        "rounds": rounds,
+        "iterations": iterations,
+    }
+
+
+def over(function, items: list):
+    """
+    Callable that applies function to every item, so one call covers a corpus.
+    """
+    def run():
+        for item in items:
+            function(item)
+    return run
+
+
+def tenant_benchmarks(tenant: str) -> list:
+    """
+    Import a tenant's modules and return [(name, callable)]. Must run in a
+    fresh interpreter per tenant.
+    """
+    tenant_dir = os.path.join(ROOT, tenant)
+    data_dir = tempfile.mkdtemp(prefix="microbench-")
+    atexit.register(shutil.rmtree, data_dir, ignore_errors=True)
+    pages = {size: synthetic_page(paragraphs) for size, paragraphs in PAGE_SIZES.items()}
+    for size, html in pages.items():
+        with open(os.path.join(data_dir, f"bench-{size}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+    os.environ.update(LOCAL_TESTING="true", LOCAL_DATA_DIR=data_dir, ANALYTICS_ENABLED="false", SITEMAP_URL="")
+    sys.path.insert(0, tenant_dir)
+    os.chdir(tenant_dir)
+
+    from starlette.requests import Request
+    import company_logic
+    from compression import reply_response
+    from microbots import MICROBOTS, get_relevant_microbot
+
+    keywords = sorted({keyword for bot in MICROBOTS for keyword in bot.keywords})
+    corpora = {kind: synthetic_messages(kind, keywords, count=200 if kind == "typical" else 20)
+               for kind in ("typical", "long", "adversarial")}
+    # Section discovery runs once at startup, not per message
+    company_logic.crawl_relevant_pages(company_logic.BASE_URL)
+
+    def can_handle_all(message):
+        for bot in MICROBOTS:
+            bot.can_handle(message)
+
+    benchmarks = []
+    for kind, messages in corpora.items():
+        benchmarks += [
+            (f"microbot_can_handle[{kind}]", over(can_handle_all, messages)),
+            (f"get_relevant_microbot[{kind}]", over(get_relevant_microbot, messages)),
+            (f"is_company_related[{kind}]", over(company_logic.is_company_related, messages)),
+            (f"select_relevant_url[{kind}]", over(company_logic.select_relevant_url, messages)),
+        ]
+    for size, html in pages.items():
+        url = company_logic.BASE_URL + f"bench-{size}"
+        company_logic.fetch_local_content(url)
+        benchmarks += [
+            (f"extract_text[{size}]", lambda html=html: company_logic.extract_text(html)),
+            (f"extract_page[{size}]", lambda html=html: company_logic.extract_page(html)),
+            (f"fetch_local_content[{size}]", lambda url=url: company_logic.fetch_local_content(url)),
+        ]
+
+    request = Request({"type": "http", "method": "POST", "path": "/chat",
+                       "headers": [(b"accept-encoding", b"gzip, deflate, br")]})
+    short_reply = {"reply": MICROBOTS[0].respond(corpora["typical"][0])}
+    page_reply = {"reply": company_logic.fetch_local_content(company_logic.BASE_URL + "bench-large"),
+                  "cursor": "0123456789abcdef.2000"}
+    benchmarks += [
+        ("reply_response[microbot]", lambda: reply_response(request, short_reply)),
+        ("reply_response[page]", lambda: reply_response(request, page_reply, deterministic=False)),
+    ]
+    return benchmarks
+
+
+def run_tenant(tenant: str, name_filter: str, min_time: float, rounds: int) -> dict:
+    results = {}
+    for name, function in tenant_benchmarks(tenant):
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(function, min_time, rounds)
+    return results
+
+
+def run(tenants: list, name_filter: str, min_time: float, rounds: int) -> dict:
+    """
+    Run every tenant's benchmarks, each in a fresh interpreter, and return
+    results keyed "tenant/benchmark".
+    """
+    results = {}
+    for tenant in tenants:
+        command = [sys.executable, os.path.abspath(__file__), "--tenant", tenant, "--worker",
+                   "--min-time", str(min_time), "--rounds", str(rounds)]
+        if name_filter:
+            command += ["--filter", name_filter]
+        process = subprocess.run(command, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise RuntimeError(f"{tenant} benchmarks failed:\n{process.stderr[-2000:]}")
+        for name, stats in json.loads(process.stdout).items():
+            results[f"{tenant}/{name}"] = stats
+    return {
+        "python": sys.version.split()[0],
+        "machine": os.uname().machine if hasattr(os, "uname") else sys.platform,
+        "cpus": os.cpu_count(),
+        "min_time": min_time,
+        "rounds": rounds,
+        "benchmarks": results,
+    }
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list:
+    """
+    List the benchmarks whose median got slower than the baseline allows.
+    Benchmarks missing from either side are not compared.
+    """
+    failures = []
+    for name, stats in report["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        limit = before["median_us"] * (1 + max_regression / 100.0)
+        if stats["median_us"] > limit:
+            failures.append(f"{name}: {stats['median_us']} us > {round(limit, 3)} us (baseline {before['median_us']} us)")
+    return failures
+
+
+def comparison_table(report: dict, baseline: dict = None) -> str:
+    """
+    Render medians as a text table, with the change against a baseline when given.
+    """
+    lines = []
+    width = max((len(name) for name in report["benchmarks"]), default=10)
+    for name, stats in report["benchmarks"].items():
+        line = f"{name:<{width}}  {stats['median_us']:>12.3f} us  +/- {stats['stddev_us']:<10.3f}"
+        before = (baseline or {}).get("benchmarks", {}).get(name)
+        if before is not None and before["median_us"]:
+            change = (stats["median_us"] / before["median_us"] - 1) * 100
+            line += f"  {change:+7.1f}% vs {before['median_us']:.3f} us"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the chatbot hot paths")
+    parser.add_argument("--tenant", choices=TENANTS, help="Benchmark one tenant (default: all)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.02, help="Shortest round, in seconds")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--save", help="Write the result to this baseline file")
+    parser.add_argument("--baseline", help="Compare against this baseline file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "RESULT"),
+                        help="Compare two saved results instead of running")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Allowed slowdown of a median over the baseline, in percent")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_tenant(args.tenant, args.filter, args.min_time, args.rounds)))
+        return
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        report = run([args.tenant] if args.tenant else list(TENANTS), args.filter, args.min_time, args.rounds)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    print(comparison_table(report, baseline))
+    if baseline is None:
+        return
+    mismatched = [key for key in ("python", "machine", "cpus") if baseline.get(key) != report.get(key)]
+    if mismatched:
+        print("\nWarning: the baseline was recorded on a different setup ("
+              + ", ".join(f"{key} {baseline.get(key)} vs {report.get(key)}" for key in mismatched)
+              + "); regenerate it with --save on this machine for a meaningful comparison.")
+    failures = regressions(report, baseline, args.max_regression)
+    if failures:
+        print(f"\n{len(failures)} regression(s) over {args.max_regression}%:")
+        for failure in failures:
+            print(f"  {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
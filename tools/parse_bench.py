@@ -0,0 +1,128 @@
+"""
+Parse pool benchmark for the chatbot apps.
+
+Measures HTML parsing throughput against the number of parse worker
+processes. For each --workers value, --threads request threads extract the
+text of --pages synthetic pages through a tenant's ParsePool (0 workers
+parses in the calling threads, as before the pool existed). Alongside, a
+probe thread keeps timing a small routing job (get_relevant_microbot over a
+handful of messages), standing in for the microbot replies served by the
+same process; its p50/p99 show how much parsing slows other routes.
+
+Throughput only scales up to the number of cores; the report includes
+os.cpu_count() so results from different machines can be read side by side.
+
+Example:
+    python tools/parse_bench.py --tenant company_chatbot --workers 0,1,2,4 --threads 8 --pages 64
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from microbench import synthetic_page  # noqa: E402
+
+PROBE_MESSAGES = ["what services do you offer", "tell me about pricing", "how do I contact support", "hello there"]
+
+
+def percentile_ms(values: list, pct: float) -> float:
+    """
+    Return the pct-th percentile of values (seconds) in milliseconds, using nearest-rank.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return round(ordered[rank] * 1000, 2)
+
+
+def probe(stop: threading.Event, route, samples: list):
+    """
+    Run a small routing job every couple of milliseconds until stopped,
+    timing each from when it was due, so waiting for the GIL counts.
+    """
+    due = time.perf_counter()
+    while not stop.is_set():
+        due += 0.002
+        stop.wait(max(0.0, due - time.perf_counter()))
+        for message in PROBE_MESSAGES:
+            route(message)
+        samples.append(time.perf_counter() - due)
+        due = max(due, time.perf_counter())
+
+
+def run_config(ParsePool, route, pages: list, workers: int, threads: int, min_bytes: int) -> dict:
+    pool = ParsePool(workers=workers, min_bytes=min_bytes, max_pending=max(workers, 1) * 2)
+    pool.start()
+    with ThreadPoolExecutor(threads) as executor:
+        # Untimed round so worker start-up and imports are not counted
+        list(executor.map(pool.extract, pages[:max(workers, 1)]))
+
+        samples = []
+        stop = threading.Event()
+        prober = threading.Thread(target=probe, args=(stop, route, samples), daemon=True)
+        prober.start()
+        started = time.perf_counter()
+        list(executor.map(pool.extract, pages))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        prober.join()
+    pool.shutdown()
+    return {
+        "workers": workers,
+        "pages_per_second": round(len(pages) / elapsed, 1),
+        "probe_p50_ms": percentile_ms(samples, 50),
+        "probe_p99_ms": percentile_ms(samples, 99),
+        "probe_samples": len(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parsing throughput versus parse worker processes")
+    parser.add_argument("--tenant", default="company_chatbot")
+    parser.add_argument("--workers", default=None,
+                        help="Comma-separated worker counts (default: 0, 1, 2, 4, ... up to the core count)")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads parsing pages")
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--paragraphs", type=int, default=100, help="Sections per synthetic page (100 is ~85 KB)")
+    parser.add_argument("--min-bytes", type=int, default=0, help="Offload threshold; 0 sends every page to the pool")
+    args = parser.parse_args()
+
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",")]
+    else:
+        counts = [0]
+        while counts[-1] < (os.cpu_count() or 1):
+            counts.append(max(1, counts[-1] * 2))
+
+    os.environ.setdefault("LOCAL_TESTING", "true")
+    os.environ.setdefault("ANALYTICS_ENABLED", "false")
+    sys.path.insert(0, os.path.join(ROOT, args.tenant))
+    from microbots import get_relevant_microbot
+    from parse_pool import ParsePool
+
+    pages = [synthetic_page(args.paragraphs, seed=index) for index in range(args.pages)]
+    results = [run_config(ParsePool, get_relevant_microbot, pages, workers, args.threads, args.min_bytes)
+               for workers in counts]
+    baseline = results[0]["pages_per_second"]
+    for result in results:
+        result["speedup"] = round(result["pages_per_second"] / baseline, 2) if baseline else None
+    print(json.dumps({
+        "tenant": args.tenant,
+        "cpus": os.cpu_count(),
+        "threads": args.threads,
+        "pages": args.pages,
+        "page_bytes": len(pages[0].encode("utf-8")),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
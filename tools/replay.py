@@ -0,0 +1,226 @@
+"""
+Replay tool for captured chat traffic.
+
+Reads the capture files an app writes with CAPTURE_ENABLED=true
+(analytics_logs/capture-*.jsonl.gz) and sends the same requests, in the
+same order, to a running app. The original spacing between requests is
+kept and can be scaled with --speed (2 means twice as fast); --speed 0
+sends them as fast as the workers allow. WebSocket messages are replayed
+through POST /chat/stream.
+
+With --compare-url every request is also sent to a second build, and the
+replies are diffed, so routing and cache changes can be checked against
+real traffic before they ship.
+
+All replayed requests come from this machine, so raise the app's per-client
+rate limit for the run (see tools/stream_harness.py).
+
+Examples:
+    python tools/replay.py company_chatbot/analytics_logs --url http://127.0.0.1:8000 --speed 10
+    python tools/replay.py capture.jsonl.gz --url http://127.0.0.1:8000 \\
+        --compare-url http://127.0.0.1:8001 --speed 0 --diff-out diffs.jsonl
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_harness import percentile  # noqa: E402
+
+
+def load_capture(paths: list, tenant: str = None) -> list:
+    """
+    Read capture records from files or directories, oldest first.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "capture-*.jsonl.gz")))
+        else:
+            files.append(path)
+    records = []
+    for path in files:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if tenant is None or record.get("tenant") == tenant:
+                    records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def read_stream_reply(response: requests.Response) -> str:
+    """
+    Join the delta events of a text/event-stream reply into one text.
+    """
+    pieces = []
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[7:]
+        elif line.startswith("data: ") and event == "delta":
+            pieces.append(json.loads(line[6:])["text"])
+    return "".join(pieces)
+
+
+def send(session: requests.Session, base_url: str, record: dict) -> tuple:
+    """
+    Send one captured request; return (status, reply text, seconds).
+    """
+    path = record["path"]
+    if path == "/chat/ws":
+        path = "/chat/stream"
+    started = time.perf_counter()
+    response = session.post(base_url.rstrip("/") + path, json=record["body"],
+                            stream=path == "/chat/stream", timeout=60)
+    if path == "/chat/stream" and response.status_code == 200:
+        reply = read_stream_reply(response)
+    else:
+        try:
+            payload = response.json()
+            reply = payload.get("reply", payload.get("detail", ""))
+        except ValueError:
+            reply = response.text
+    return response.status_code, reply, time.perf_counter() - started
+
+
+def replay(records: list, url: str, speed: float, concurrency: int,
+           compare_url: str = None, diff_out=None) -> dict:
+    """
+    Replay records against url (and compare_url) and collect statistics.
+    """
+    local = threading.local()
+    lock = threading.Lock()
+    results = {"latencies": [], "compare_latencies": [], "statuses": {}, "errors": 0,
+               "compared": 0, "differing": 0, "lag": []}
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    # One slot per worker, so the sender waits instead of queueing work the workers cannot start
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def one(record: dict, due: float):
+        try:
+            if due is not None:
+                # Lag counts from when the request was due to when it is actually sent
+                lag = max(0.0, time.perf_counter() - due)
+                with lock:
+                    results["lag"].append(lag)
+            run(record)
+        finally:
+            slots.release()
+
+    def run(record: dict):
+        try:
+            status, reply, seconds = send(session(), url, record)
+            if compare_url:
+                other_status, other_reply, other_seconds = send(session(), compare_url, record)
+        except requests.RequestException:
+            with lock:
+                results["errors"] += 1
+            return
+        with lock:
+            results["latencies"].append(seconds)
+            results["statuses"][status] = results["statuses"].get(status, 0) + 1
+            if not compare_url:
+                return
+            results["compare_latencies"].append(other_seconds)
+            results["compared"] += 1
+            if (status, reply) != (other_status, other_reply):
+                results["differing"] += 1
+                if diff_out is not None:
+                    diff_out.write(json.dumps({
+                        "path": record["path"], "body": record["body"],
+                        "status": status, "compare_status": other_status,
+                        "reply": reply, "compare_reply": other_reply,
+                    }, ensure_ascii=False) + "\n")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        first_ts = records[0]["ts"] if records else 0.0
+        for record in records:
+            due = None
+            if speed > 0:
+                # Keep the captured spacing, scaled, measured from the start of the run
+                due = started + (record["ts"] - first_ts) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            slots.acquire()
+            pool.submit(one, record, due)
+    duration = time.perf_counter() - started
+
+    def ms(values, pct):
+        return round(percentile(values, pct) * 1000, 2)
+
+    report = {
+        "requests": len(records),
+        "speed": speed or "max",
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(records) / duration, 1) if duration else 0.0,
+        "p50_ms": ms(results["latencies"], 50),
+        "p95_ms": ms(results["latencies"], 95),
+        "p99_ms": ms(results["latencies"], 99),
+        "max_ms": round(max(results["latencies"], default=0.0) * 1000, 2),
+        "statuses": results["statuses"],
+        "errors": results["errors"],
+    }
+    if speed > 0:
+        # How far behind schedule the sender fell; large values mean the run was not faithful
+        report["send_lag_p99_ms"] = ms(results["lag"], 99)
+    if compare_url:
+        report["compare"] = {
+            "p50_ms": ms(results["compare_latencies"], 50),
+            "p95_ms": ms(results["compare_latencies"], 95),
+            "p99_ms": ms(results["compare_latencies"], 99),
+            "replies_compared": results["compared"],
+            "replies_differing": results["differing"],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured chat traffic against an app")
+    parser.add_argument("captures", nargs="+", help="Capture files or directories holding them")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the app to replay against")
+    parser.add_argument("--compare-url", help="Base URL of a second build to diff replies against")
+    parser.add_argument("--tenant", help="Only replay requests captured from this tenant")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Time scale: 1 is real time, 10 is ten times faster, 0 is as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--diff-out", help="Write differing replies to this JSON-lines file")
+    args = parser.parse_args()
+
+    records = load_capture(args.captures, args.tenant)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        parser.error("no captured requests found")
+
+    diff_out = open(args.diff_out, "w", encoding="utf-8") if args.diff_out else None
+    try:
+        report = replay(records, args.url, args.speed, args.concurrency, args.compare_url, diff_out)
+    finally:
+        if diff_out is not None:
+            diff_out.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the upstream websites.
+
+Serves a tenant's local_data/*.html over HTTP with injected latency jitter,
+so fetch behaviour (timeouts, circuit breaking, hedging) can be exercised
+without touching the real sites. Most requests take around --base-latency;
+a --slow-fraction of them take --slow-latency instead, giving the long tail
+real sites show.
+
+Example:
+    python tools/standin_site.py --data company_chatbot/local_data --port 8099 \
+        --base-latency 0.2 --slow-fraction 0.05 --slow-latency 2.0
+"""
+
+import argparse
+import os
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInSite:
+    """
+    Maps request paths to HTML files and decides how long each response takes.
+    """
+    def __init__(self, data_dir: str, base_latency: float, jitter: float,
+                 slow_fraction: float, slow_latency: float, seed: int = None):
+        self.data_dir = data_dir
+        self.base_latency = base_latency
+        self.jitter = jitter
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self.random = random.Random(seed)
+
+    def resolve(self, path: str) -> str:
+        """
+        Return the file to serve for a URL path, or None.
+        """
+        segment = path.split("?")[0].strip("/").split("/")[-1]
+        if not segment:
+            return os.path.join(self.data_dir, "index.html")
+        if segment.endswith(".html") or segment.endswith(".xml"):
+            candidate = os.path.join(self.data_dir, segment)
+            return candidate if os.path.exists(candidate) else None
+        candidate = os.path.join(self.data_dir, segment + ".html")
+        if os.path.exists(candidate):
+            return candidate
+        # Tolerate slugs such as about-us -> about.html
+        for name in sorted(os.listdir(self.data_dir)):
+            if name.endswith(".html") and segment.startswith(name[:-5]):
+                return os.path.join(self.data_dir, name)
+        return None
+
+    def delay(self) -> float:
+        """
+        Draw the latency for one response.
+        """
+        if self.random.random() < self.slow_fraction:
+            base = self.slow_latency
+        else:
+            base = self.base_latency
+        return max(0.0, base + self.random.uniform(-self.jitter, self.jitter))
+
+
+def make_handler(site: StandInSite):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(site.delay())
+            file_path = site.resolve(self.path)
+            if file_path is None:
+                self.send_error(404)
+                return
+            with open(file_path, "rb") as handle:
+                body = handle.read()
+            content_type = "application/xml" if file_path.endswith(".xml") else "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up, e.g. a hedged attempt that lost the race
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(site: StandInSite, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for a stand-in site (call serve_forever on it).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local_data as a jittery stand-in site")
+    parser.add_argument("--data", default="company_chatbot/local_data", help="Directory of HTML files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--base-latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    site = StandInSite(args.data, args.base_latency, args.jitter,
+                       args.slow_fraction, args.slow_latency, args.seed)
+    print(f"Serving {args.data} on http://{args.host}:{args.port}/")
+    serve(site, args.host, args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Startup benchmark for the chatbot apps.
+
+Measures, for one tenant:
+  * the import time of main and its heaviest direct imports (python -X importtime),
+  * whether the fetch/parse stacks (requests, bs4) were loaded at import,
+    which they must not be,
+  * the time from launching uvicorn to the first successfully served /chat.
+
+Each measurement is repeated --runs times in fresh processes and the median
+is reported. With --save the result becomes a baseline file; with --baseline
+the run fails (exit code 1) when the median import time or time to first
+/chat regresses by more than --max-regression percent.
+
+Example:
+    python tools/startup_bench.py --tenant company_chatbot --runs 5 --save startup_baseline.json
+    python tools/startup_bench.py --tenant company_chatbot --baseline startup_baseline.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load when a page is first fetched or parsed
+DEFERRED_MODULES = ("requests", "bs4")
+
+
+def import_profile(tenant_dir: str) -> dict:
+    """
+    Import main in a fresh interpreter and return cumulative microseconds per
+    module imported directly by main, plus main itself and the deferred modules.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=tenant_dir, capture_output=True, text=True, env=dict(os.environ, LOCAL_TESTING="true"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    # Children are listed before their parent, so collect until main's own line
+    pending = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # One space follows the separator, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == "main":
+                pending["main"] = int(cumulative)
+                return pending
+            # A top-level import made by the interpreter itself, not by main
+            pending = {}
+        elif depth == 1 or name in DEFERRED_MODULES:
+            pending[name] = int(cumulative)
+    raise RuntimeError("main not found in the import profile")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_chat(tenant_dir: str, timeout: float = 30.0) -> float:
+    """
+    Launch the app and return seconds until POST /chat first succeeds.
+    """
+    port = free_port()
+    body = json.dumps({"message": "hi"}).encode("utf-8")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tenant_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, LOCAL_TESTING="true", ANALYTICS_ENABLED="false"),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/chat", data=body,
+                                             headers={"Content-Type": "application/json"})
+            try:
+                with urllib.request.urlopen(request, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"App did not serve /chat within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run(tenant: str, runs: int) -> dict:
+    tenant_dir = os.path.join(ROOT, tenant)
+    profiles = [import_profile(tenant_dir) for _ in range(runs)]
+    first_chat = [time_to_first_chat(tenant_dir) for _ in range(runs)]
+    modules = sorted({name for profile in profiles for name in profile})
+    breakdown = {name: round(statistics.median(profile.get(name, 0) for profile in profiles) / 1000, 2)
+                 for name in modules}
+    return {
+        "tenant": tenant,
+        "runs": runs,
+        "import_main_ms": breakdown.pop("main", 0.0),
+        "first_chat_ms": round(statistics.median(first_chat) * 1000, 1),
+        "deferred_loaded_at_import": [name for name in DEFERRED_MODULES if name in breakdown],
+        "import_breakdown_ms": dict(sorted(breakdown.items(), key=lambda item: -item[1])),
+    }
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list:
+    """
+    List the measurements that got slower than the baseline allows.
+    """
+    failures = []
+    for key in ("import_main_ms", "first_chat_ms"):
+        limit = baseline[key] * (1 + max_regression / 100.0)
+        if report[key] > limit:
+            failures.append(f"{key}: {report[key]} ms > {round(limit, 1)} ms (baseline {baseline[key]} ms)")
+    if report["deferred_loaded_at_import"]:
+        failures.append(f"deferred modules imported at startup: {report['deferred_loaded_at_import']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark for a chatbot app")
+    parser.add_argument("--tenant", default="company_chatbot")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="Write the result to this baseline file")
+    parser.add_argument("--baseline", help="Compare against this baseline file")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Allowed slowdown over the baseline, in percent")
+    args = parser.parse_args()
+
+    report = run(args.tenant, args.runs)
+    failures = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = regressions(report, json.load(f), args.max_regression)
+        report["regressions"] = failures
+    elif report["deferred_loaded_at_import"]:
+        failures = [f"deferred modules imported at startup: {report['deferred_loaded_at_import']}"]
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Concurrent session harness for the streaming chat endpoint.
+
+Opens many keep-alive connections at once, one per simulated chat session,
+and sends messages to POST /chat/stream on each, measuring time to the first
+reply text and to the end of each reply. Uses only asyncio sockets, so a few
+thousand sessions fit in one process.
+
+The app's per-client rate limit and concurrency cap apply to all sessions
+from this machine, so raise them for the run, e.g.:
+    RATE_LIMIT_PER_SECOND=100000 RATE_LIMIT_BURST=100000 \
+    MAX_CONCURRENT_REQUESTS=256 MAX_QUEUED_REQUESTS=10000 uvicorn main:app
+
+Example:
+    python tools/stream_harness.py --host 127.0.0.1 --port 8000 --sessions 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_harness import DEFAULT_CHAT_MESSAGES, percentile  # noqa: E402
+
+
+async def read_chunked_events(reader: asyncio.StreamReader):
+    """
+    Yield (event, data) pairs from a chunked text/event-stream body.
+    """
+    buffer = ""
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.strip() or b"0", 16)
+        if size == 0:
+            await reader.readline()
+            return
+        chunk = await reader.readexactly(size)
+        await reader.readline()
+        buffer += chunk.decode("utf-8")
+        while "\n\n" in buffer:
+            raw_event, buffer = buffer.split("\n\n", 1)
+            event, data = "message", ""
+            for line in raw_event.splitlines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: "):
+                    data = line[6:]
+            yield event, data
+
+
+async def send_message(reader, writer, host: str, message: str) -> tuple:
+    """
+    Send one message on an open connection; return (first_piece_s, total_s, status).
+    """
+    body = json.dumps({"message": message}).encode("utf-8")
+    request = (
+        f"POST /chat/stream HTTP/1.1\r\nHost: {host}\r\n"
+        "Content-Type: application/json\r\nAccept: text/event-stream\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode("ascii") + body
+    started = time.perf_counter()
+    writer.write(request)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") != "chunked":
+        await reader.readexactly(int(headers.get("content-length", "0")))
+        return None, time.perf_counter() - started, status
+
+    first_piece = None
+    async for event, _ in read_chunked_events(reader):
+        if event == "delta" and first_piece is None:
+            first_piece = time.perf_counter() - started
+    return first_piece, time.perf_counter() - started, status
+
+
+async def session(index: int, args, results: dict, open_sessions: list):
+    """
+    Run one simulated chat session over a single connection.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    except OSError:
+        results["connect_errors"] += 1
+        return
+    open_sessions[0] += 1
+    results["peak_sessions"] = max(results["peak_sessions"], open_sessions[0])
+    try:
+        for turn in range(args.messages):
+            message = DEFAULT_CHAT_MESSAGES[(index + turn) % len(DEFAULT_CHAT_MESSAGES)]
+            first_piece, total, status = await send_message(reader, writer, args.host, message)
+            results["statuses"][status] = results["statuses"].get(status, 0) + 1
+            if first_piece is not None:
+                results["first_piece"].append(first_piece)
+            results["total"].append(total)
+            await asyncio.sleep(args.think_time)
+    except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+        results["errors"] += 1
+    finally:
+        open_sessions[0] -= 1
+        writer.close()
+
+
+async def run(args) -> dict:
+    results = {"first_piece": [], "total": [], "statuses": {}, "errors": 0,
+               "connect_errors": 0, "peak_sessions": 0}
+    open_sessions = [0]
+    started = time.perf_counter()
+    # Stagger connection setup slightly so the listen backlog is not overrun
+    tasks = []
+    for index in range(args.sessions):
+        tasks.append(asyncio.create_task(session(index, args, results, open_sessions)))
+        if index % 200 == 199:
+            await asyncio.sleep(0.05)
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - started
+
+    def ms(values, pct):
+        return round(percentile(values, pct) * 1000, 1)
+
+    return {
+        "sessions": args.sessions,
+        "peak_open_sessions": results["peak_sessions"],
+        "messages": len(results["total"]),
+        "duration_s": round(duration, 2),
+        "messages_per_s": round(len(results["total"]) / duration, 1) if duration else 0.0,
+        "first_piece_p50_ms": ms(results["first_piece"], 50),
+        "first_piece_p99_ms": ms(results["first_piece"], 99),
+        "message_p50_ms": ms(results["total"], 50),
+        "message_p99_ms": ms(results["total"], 99),
+        "statuses": results["statuses"],
+        "errors": results["errors"],
+        "connect_errors": results["connect_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent streaming session harness")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--sessions", type=int, default=1000, help="Concurrent chat sessions")
+    parser.add_argument("--messages", type=int, default=3, help="Messages sent per session")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Pause between messages (s)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()